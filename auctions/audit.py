@@ -0,0 +1,95 @@
+"""
+Buffered audit records for login and bid attempts.
+
+Request handlers push attempts onto Redis lists instead of inserting a row
+each; the flush_attempt_audit task drains the lists into Postgres with
+bulk_create. If Redis is unavailable the row is written directly, so no
+attempt goes unrecorded.
+"""
+import json
+import logging
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+from redis.exceptions import LockNotOwnedError
+
+from .models import BidAttempt, LoginAttempt
+
+logger = logging.getLogger(__name__)
+
+LOGIN_ATTEMPTS_QUEUE = "audit:login_attempts"
+BID_ATTEMPTS_QUEUE = "audit:bid_attempts"
+FLUSH_BATCH_SIZE = 1000
+FLUSH_LOCK_TIMEOUT = 5 * 60  # Released early; only guards against a crashed flusher
+
+
+def _push(queue, model, fields):
+    fields["timestamp"] = timezone.now()
+    try:
+        record = dict(fields, timestamp=fields["timestamp"].isoformat())
+        get_redis_connection("default").rpush(queue, json.dumps(record))
+    except Exception:
+        logger.warning("Audit queue unavailable; writing %s directly", model.__name__, exc_info=True)
+        model.objects.create(**fields)
+
+
+def queue_login_attempt(email, ip_address, success):
+    """Record a login attempt without touching the database"""
+    _push(
+        LOGIN_ATTEMPTS_QUEUE,
+        LoginAttempt,
+        {"email": email, "ip_address": ip_address, "success": success},
+    )
+
+
+def queue_bid_attempt(user_id, ip_address, success):
+    """Record a bid attempt without touching the database"""
+    _push(
+        BID_ATTEMPTS_QUEUE,
+        BidAttempt,
+        {"user_id": user_id, "ip_address": ip_address, "success": success},
+    )
+
+
+def flush_queue(queue, model):
+    """Move every buffered record on queue into the model's table, in batches"""
+    conn = get_redis_connection("default")
+    # One flusher per queue: records stay on the list until they are inserted,
+    # so two overlapping runs would insert the same batch twice
+    lock = conn.lock(f"{queue}:flush_lock", timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return 0
+
+    flushed = 0
+    try:
+        while True:
+            records = conn.lrange(queue, 0, FLUSH_BATCH_SIZE - 1)
+            if not records:
+                return flushed
+
+            rows = []
+            for raw in records:
+                fields = json.loads(raw)
+                fields["timestamp"] = parse_datetime(fields["timestamp"])
+                rows.append(model(**fields))
+            model.objects.bulk_create(rows, batch_size=FLUSH_BATCH_SIZE)
+
+            # Drop the batch only once it is in Postgres; a failed insert
+            # leaves it queued for the next run. New records are appended at
+            # the tail, so trimming the head never loses them
+            conn.ltrim(queue, len(records), -1)
+            flushed += len(rows)
+
+            # Keep the lock for as long as batches keep coming
+            try:
+                lock.reacquire()
+            except LockNotOwnedError:
+                logger.warning("Flush lock on %s expired; leaving the rest queued", queue)
+                return flushed
+    finally:
+        try:
+            lock.release()
+        except LockNotOwnedError:
+            # Expired mid-batch; another flusher may hold it now
+            pass
@@ -2,6 +2,7 @@ import logging
 import time
 
 from django.conf import settings
+from django.contrib.messages.middleware import MessageMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -13,23 +14,22 @@ class TimingMiddleware:
         self.warning_threshold = getattr(settings, "REQUEST_TIMING_WARNING_THRESHOLD", 0.5)  # 500ms
         self.critical_threshold = getattr(settings, "REQUEST_TIMING_CRITICAL_THRESHOLD", 2.0)  # 2s
         # Track paths to exclude from logging (static, media, admin)
-        self.exclude_paths = ["/static/", "/media/", "/admin/jsi18n/"]
+        self.exclude_paths = ("/static/", "/media/", "/admin/jsi18n/")
 
     def __call__(self, request):
         # Skip timing for excluded paths
         path = request.path
-        for exclude in self.exclude_paths:
-            if exclude in path:
-                return self.get_response(request)
+        if any(exclude in path for exclude in self.exclude_paths):
+            return self.get_response(request)
 
-        # Start timing
-        start_time = time.time()
+        # Start timing (monotonic, high resolution)
+        start_time = time.perf_counter()
 
         # Process the request
         response = self.get_response(request)
 
         # Calculate duration
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
 
         # Add duration header for debugging
         response["X-Request-Duration"] = f"{duration:.4f}"
@@ -39,12 +39,32 @@ class TimingMiddleware:
             return response
 
         # Different log levels based on duration
+        # Lazy %-formatting so records below the logger level are never formatted
         if duration > self.critical_threshold:
-            logger.error(f"CRITICAL: Request to {path} took {duration:.4f}s")
+            logger.error("CRITICAL: Request to %s took %.4fs", path, duration)
         elif duration > self.warning_threshold:
-            logger.warning(f"SLOW: Request to {path} took {duration:.4f}s")
-        elif settings.DEBUG:
+            logger.warning("SLOW: Request to %s took %.4fs", path, duration)
+        elif settings.DEBUG and logger.isEnabledFor(logging.DEBUG):
             # Only log normal requests in debug mode
-            logger.info(f"Request to {path} took {duration:.4f}s")
+            logger.debug("Request to %s took %.4fs", path, duration)
 
         return response
+
+
+class AdminMessageMiddleware(MessageMiddleware):
+    """
+    Flash messages are only used by the admin; API requests skip setting up
+    message storage. Subclassing keeps the admin's MessageMiddleware check happy
+    """
+
+    api_prefix = "/api/"
+
+    def process_request(self, request):
+        if request.path.startswith(self.api_prefix):
+            return None
+        return super().process_request(request)
+
+    def process_response(self, request, response):
+        if not hasattr(request, "_messages"):
+            return response
+        return super().process_response(request, response)
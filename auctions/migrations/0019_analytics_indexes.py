@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0018_analytics_rollups"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["date_joined"], name="user_date_joined_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(
+                condition=models.Q(("success", False)),
+                fields=["email", "ip_address", "timestamp"],
+                name="login_failed_attempts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(fields=["created_at"], name="bid_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["end_date", "current_price"], name="item_enddate_price_idx"
+            ),
+        ),
+    ]
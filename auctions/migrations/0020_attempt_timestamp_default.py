@@ -0,0 +1,22 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0019_analytics_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bidattempt",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="loginattempt",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Fill the rollup tables from existing bids and items, so the dashboard has
+    history before refresh_analytics_rollups first runs
+    """
+    Bid = apps.get_model("auctions", "Bid")
+    Item = apps.get_model("auctions", "Item")
+    DailyBidRollup = apps.get_model("auctions", "DailyBidRollup")
+    MonthlySalesRollup = apps.get_model("auctions", "MonthlySalesRollup")
+
+    MonthlySalesRollup.objects.all().delete()
+    MonthlySalesRollup.objects.bulk_create(
+        MonthlySalesRollup(
+            month=row["month"].date(), revenue=row["revenue"] or 0, items_sold=row["items_sold"]
+        )
+        for row in Item.objects.filter(end_date__lt=timezone.now())
+        .annotate(month=TruncMonth("end_date"))
+        .values("month")
+        .annotate(revenue=Sum("current_price"), items_sold=Count("id"))
+        .order_by()
+    )
+
+    DailyBidRollup.objects.all().delete()
+    DailyBidRollup.objects.bulk_create(
+        DailyBidRollup(day=row["day"].date(), count=row["count"])
+        for row in Bid.objects.annotate(day=TruncDay("created_at"))
+        .values("day")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0020_attempt_timestamp_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
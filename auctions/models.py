@@ -6,7 +6,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
-from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models import Count, F, OuterRef, Prefetch, Q, Subquery
 from django.utils import timezone
 
 if TYPE_CHECKING:
@@ -65,6 +65,9 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            models.Index(fields=["date_joined"], name="user_date_joined_idx"),
+        ]
 
 
 class LoginAttempt(models.Model):
@@ -72,7 +75,8 @@ class LoginAttempt(models.Model):
 
     email = models.EmailField()
     ip_address = models.GenericIPAddressField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the attempt happens, not when its buffered audit row is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     success = models.BooleanField(default=False)
 
     def __str__(self):
@@ -80,6 +84,14 @@ class LoginAttempt(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            # Serves the failed-attempt counts in the login view
+            models.Index(
+                fields=["email", "ip_address", "timestamp"],
+                condition=Q(success=False),
+                name="login_failed_attempts_idx",
+            ),
+        ]
 
 
 class BidAttempt(models.Model):
@@ -87,7 +99,8 @@ class BidAttempt(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     ip_address = models.GenericIPAddressField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the attempt happens, not when its buffered audit row is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     success = models.BooleanField(default=False)
 
     def __str__(self):
@@ -153,8 +166,19 @@ class ItemQuerySet(models.QuerySet):
     def with_full_relations(self):
         """Load all related data for detailed views"""
         return self.prefetch_related(
-            "images",
-            "bids__user",
+            Prefetch("images", queryset=ItemImage.objects.only("id", "item_id", "image", "order")),
+            Prefetch(
+                "bids",
+                queryset=Bid.objects.select_related("user").only(
+                    "id",
+                    "item_id",
+                    "amount",
+                    "created_at",
+                    "user_id",
+                    "user__nickname",
+                    "user__email",
+                ),
+            ),
         ).select_related("category", "winner")
 
 
@@ -174,6 +198,9 @@ class ItemManager(models.Manager):
     def with_first_image(self):
         return self.get_queryset().with_first_image()
 
+    def with_full_relations(self):
+        return self.get_queryset().with_full_relations()
+
 
 class Item(models.Model):
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
@@ -208,6 +235,9 @@ class Item(models.Model):
             models.Index(fields=["created_at"]),
             models.Index(fields=["category", "end_date"]),
             models.Index(fields=["category", "is_active", "end_date"]),
+            models.Index(fields=["-end_date", "-id"], name="item_enddate_id_desc_idx"),
+            models.Index(fields=["is_active", "end_date"], name="item_active_enddate_idx"),
+            models.Index(fields=["end_date", "current_price"], name="item_enddate_price_idx"),
         ]
         ordering = ["-created_at"]  # Default ordering
 
@@ -247,6 +277,7 @@ class Bid(models.Model):
         indexes = [
             models.Index(fields=["item", "amount"]),
             models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["created_at"], name="bid_created_at_idx"),
         ]
 
     def __str__(self):
@@ -256,9 +287,12 @@ class Bid(models.Model):
         )
 
     def clean(self):
-        if self.item.bids.exists():
-            highest_bid = self.item.bids.first()  # Due to ordering = ['-amount']
-            max_allowed = highest_bid.amount * 2
+        # Single query for the current highest amount (ordering = ['-amount'])
+        highest_amount = (
+            Bid.objects.filter(item_id=self.item_id).values_list("amount", flat=True).first()
+        )
+        if highest_amount is not None:
+            max_allowed = highest_amount * 2
             if self.amount > max_allowed:
                 raise ValidationError(
                     f"Bid cannot exceed {int(max_allowed)}$ (100% more than current bid)"
@@ -299,3 +333,32 @@ class ItemImage(models.Model):
 
     def __str__(self):
         return f"Image {self.order} for {self.item.title}"
+
+
+class MonthlySalesRollup(models.Model):
+    """Precomputed revenue of ended auctions per month, for the analytics dashboard"""
+
+    month = models.DateField(unique=True)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["month"]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: ${self.revenue} ({self.items_sold} items)"
+
+
+class DailyBidRollup(models.Model):
+    """Precomputed number of bids per day, for the analytics dashboard"""
+
+    day = models.DateField(unique=True)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day"]
+
+    def __str__(self):
+        return f"{self.day}: {self.count} bids"
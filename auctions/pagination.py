@@ -45,3 +45,15 @@ class OptimizedPagination(pagination.PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class PastAuctionsCursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination for finished auctions - no COUNT(*) and no OFFSET,
+    so deep pages cost the same as the first one
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-end_date", "-id")
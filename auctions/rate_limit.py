@@ -0,0 +1,97 @@
+"""
+Sliding-window rate limiting on Redis.
+
+Two algorithms are available, selected by settings.RATE_LIMIT_ALGORITHM:
+
+- "sliding_log": a sorted set with one member per event, scored by its
+  timestamp in ms. Exact, but memory grows with the number of events.
+- "approximate_sliding": one counter per fixed window; the count is the
+  current window plus the previous one weighted by how much of it still
+  overlaps the sliding window. Constant memory per key, slightly approximate.
+
+Both run as Lua scripts, atomically and in one round-trip. If Redis is
+unavailable the limiter fails open rather than locking users out.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: window key
+# ARGV: now (ms), window length (ms), member for this event, record flag
+SLIDING_WINDOW_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+local count = redis.call('ZCARD', KEYS[1])
+if ARGV[4] == '1' then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return count
+"""
+
+# KEYS[1]: current window counter, KEYS[2]: previous window counter
+# ARGV: record flag, counter TTL (s)
+WINDOW_COUNTERS_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if ARGV[1] == '1' then
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return {current, previous}
+"""
+
+
+def sliding_window_count(key, period, record=False):
+    """
+    Return how many events were recorded under key in the last period
+    seconds, recording this one as well if requested
+    """
+    try:
+        conn = get_redis_connection("default")
+        now_ms = int(time.time() * 1000)
+        # The random suffix keeps events in the same millisecond distinct
+        member = f"{now_ms}-{uuid.uuid4().hex[:8]}"
+        script = conn.register_script(SLIDING_WINDOW_SCRIPT)
+        return int(script(keys=[key], args=[now_ms, period * 1000, member, int(record)]))
+    except Exception:
+        logger.warning("Rate limit backend unavailable; allowing request", exc_info=True)
+        return 0
+
+
+def approximate_window_count(key, period, record=False):
+    """
+    Estimate how many events were recorded under key in the last period
+    seconds from two fixed-window counters, recording this one as well if
+    requested
+    """
+    try:
+        conn = get_redis_connection("default")
+        now = time.time()
+        window = int(now // period)
+        # Counters live for two windows so the previous one is still readable
+        script = conn.register_script(WINDOW_COUNTERS_SCRIPT)
+        current, previous = script(
+            keys=[f"{key}:{window}", f"{key}:{window - 1}"], args=[int(record), period * 2]
+        )
+        elapsed = (now % period) / period
+        return int(previous) * (1 - elapsed) + int(current)
+    except Exception:
+        logger.warning("Rate limit backend unavailable; allowing request", exc_info=True)
+        return 0
+
+
+def window_count(key, period, record=False):
+    """Count events under key with the configured rate limit algorithm"""
+    if getattr(settings, "RATE_LIMIT_ALGORITHM", "sliding_log") == "approximate_sliding":
+        return approximate_window_count(key, period, record)
+    return sliding_window_count(key, period, record)
+
+
+def record_event(key, period):
+    """Record an event under key without checking the limit"""
+    window_count(key, period, record=True)
@@ -1,3 +1,5 @@
+import copy
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
@@ -9,7 +11,34 @@ from .profanity_filter import profanity_filter
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """
+    Build a ModelSerializer's fields once per class instead of once per
+    instance. Model introspection is the expensive part of get_fields; each
+    instance still gets its own field objects because fields are bound to
+    their parent.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        # Looked up in the class's own __dict__ so a subclass never reuses
+        # its parent's fields
+        cached = cls.__dict__.get("_cached_fields")
+        if cached is None:
+            cached = super().get_fields()
+            cls._cached_fields = cached
+        return {name: self._copy_field(field) for name, field in cached.items()}
+
+    @staticmethod
+    def _copy_field(field):
+        # Nested serializers and many=True relations hold bound children of
+        # their own and need a deep copy; a shallow copy suffices otherwise
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            return copy.deepcopy(field)
+        return copy.copy(field)
+
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for user details including notification preferences"""
 
     class Meta:
@@ -157,7 +186,7 @@ class BidListSerializer(serializers.ModelSerializer):
 
 
 # Full BidSerializer for detail views - keeping same as original for compatibility
-class BidSerializer(serializers.ModelSerializer):
+class BidSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     user_nickname = serializers.CharField(source="user.nickname", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
 
@@ -173,6 +202,19 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "code"]
 
 
+def build_image_url(filename):
+    """Full S3 URL for a stored item image name"""
+    if not filename:
+        return None
+
+    # Ensure we don't duplicate paths - just use the filename if it contains a path already
+    if "/" in filename:
+        # The file already has a path structure
+        return f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_STORAGE_BUCKET_NAME}/{filename}"
+    # Just the filename, use media/items/ path
+    return f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_STORAGE_BUCKET_NAME}/media/items/{filename}"
+
+
 class ItemImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
     
@@ -183,21 +225,12 @@ class ItemImageSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         # Return the full URL with the correct path
         if obj.image:
-            # Get the filename from the path
-            filename = obj.image.name
-            
-            # Ensure we don't duplicate paths - just use the filename if it contains a path already
-            if '/' in filename:
-                # The file already has a path structure
-                return f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_STORAGE_BUCKET_NAME}/{filename}"
-            else:
-                # Just the filename, use media/items/ path
-                return f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_STORAGE_BUCKET_NAME}/media/items/{filename}"
+            return build_image_url(obj.image.name)
         return None
 
 
 # A lightweight serializer for list views
-class ItemListSerializer(serializers.ModelSerializer):
+class ItemListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for item list views"""
 
     image_url = serializers.SerializerMethodField()
@@ -226,15 +259,15 @@ class ItemListSerializer(serializers.ModelSerializer):
 
     def get_image_url(self, obj):
         """Return only the first image URL or None"""
-        # Use the annotated first_image if available
-        if hasattr(obj, "first_image") and obj.first_image:
-            return obj.first_image
-
-        # Fallback to prefetched images
-        if hasattr(obj, "images") and obj.images.exists():
-            first_image = obj.images.first()
-            if first_image and first_image.image:
-                return first_image.image.url
+        # Use the annotated first_image if available. A None annotation means the
+        # item has no images, so don't fall back to a query per row.
+        if hasattr(obj, "first_image"):
+            return obj.first_image or None
+
+        # Fallback for querysets without the annotation
+        first_image = obj.images.first()
+        if first_image and first_image.image:
+            return first_image.image.url
         return None
 
     def get_time_remaining(self, obj):
@@ -255,7 +288,7 @@ class ItemListSerializer(serializers.ModelSerializer):
 
 # Keep the original ItemSerializer for backwards compatibility
 # but rename to ItemDetailSerializer for clarity
-class ItemDetailSerializer(serializers.ModelSerializer):
+class ItemDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     images = ItemImageSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     bids = BidSerializer(many=True, read_only=True)
@@ -294,7 +327,7 @@ class ItemDetailSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     sender_username = serializers.CharField(source="sender.username", read_only=True)
     receiver_username = serializers.CharField(
         source="receiver.username", read_only=True, allow_null=True
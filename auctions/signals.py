@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Bid, Item, ItemImage, Message
+
+# Folded into every key built by ItemViewSet._cache_key; bumping it orphans
+# all cached item responses at once, and they age out on their own TTL
+ITEM_CACHE_VERSION_KEY = "items:version"
+
+# Staff share one conversation list; users get their own list and chat
+STAFF_CONVERSATIONS_CACHE_KEY = "messages:conversations:staff"
+
+
+def item_cache_version():
+    """Current version of the cached item responses"""
+    # Read on every cached request: one GET, seeding the key only on a miss
+    version = cache.get(ITEM_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(ITEM_CACHE_VERSION_KEY, 1, None)
+        version = cache.get(ITEM_CACHE_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_item_cache():
+    """Invalidate all cached item list/detail responses"""
+    cache.add(ITEM_CACHE_VERSION_KEY, 1, None)
+    cache.incr(ITEM_CACHE_VERSION_KEY)
+
+
+def conversations_cache_key(user):
+    """Cache key for a user's my_conversations response"""
+    if user.is_staff:
+        return STAFF_CONVERSATIONS_CACHE_KEY
+    return f"messages:conversations:{user.pk}"
+
+
+def chat_cache_key(user):
+    """Cache key for a user's admin_chat response"""
+    return f"messages:chat:{user.pk}"
+
+
+def invalidate_conversation_cache(*user_ids):
+    """Drop cached conversation/chat responses for the given users and staff"""
+    keys = [STAFF_CONVERSATIONS_CACHE_KEY]
+    for user_id in user_ids:
+        if user_id:
+            keys += [f"messages:conversations:{user_id}", f"messages:chat:{user_id}"]
+    cache.delete_many(keys)
+
+
+@receiver([post_save, post_delete], sender=Item)
+@receiver([post_save, post_delete], sender=Bid)
+@receiver([post_save, post_delete], sender=ItemImage)
+def item_data_changed(sender, **kwargs):
+    """Invalidate cached item responses whenever the data behind them changes"""
+    # After commit, so a concurrent reader can't re-cache the pre-commit rows
+    # under the new version
+    transaction.on_commit(invalidate_item_cache)
+
+
+@receiver([post_save, post_delete], sender=Message)
+def message_changed(sender, instance, **kwargs):
+    """Invalidate cached conversations for both sides of a message"""
+    invalidate_conversation_cache(instance.sender_id, instance.receiver_id)
@@ -1,12 +1,48 @@
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
 from storages.backends.s3boto3 import S3Boto3Storage
 import boto3
+import hashlib
 import logging
+from functools import lru_cache
 from PIL import Image
 from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Identical uploads map to the object already stored for them
+UPLOAD_DIGEST_CACHE_TIMEOUT = 7 * 24 * 60 * 60  # 1 week
+
+# Largest image accepted for upload
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+
+def _is_image_magic(head):
+    """Check the leading bytes of a file for a PNG/JPEG/GIF/WebP signature"""
+    return (
+        head.startswith(b"\x89PNG")
+        or head.startswith(b"\xff\xd8\xff")
+        or head.startswith(b"GIF8")
+        or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+    )
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Shared S3 client for the project storage settings. Clients are
+    thread-safe, so one per process keeps its connection pool warm
+    """
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=settings.AWS_S3_CLIENT_CONFIG,
+    )
+
+
 class DebugS3Storage(S3Boto3Storage):
     """Storage class with image optimization before upload"""
     location = ""
@@ -14,6 +50,26 @@ class DebugS3Storage(S3Boto3Storage):
     def _save(self, name, content):
         """Optimize images before saving to S3"""
         try:
+            # Reuse the stored object for byte-identical image uploads
+            digest_key = None
+            if self._is_image_file(name):
+                # Cheap checks first, before hashing or decoding anything
+                if getattr(content, "size", 0) > MAX_UPLOAD_BYTES:
+                    raise SuspiciousFileOperation(
+                        f"Image {name} exceeds {MAX_UPLOAD_BYTES} bytes"
+                    )
+                content.seek(0)
+                head = content.read(12)
+                content.seek(0)
+                if not _is_image_magic(head):
+                    raise SuspiciousFileOperation(f"File {name} is not a supported image")
+
+                digest_key = f"image_upload:{self.bucket_name}:{self._content_digest(content)}"
+                stored_name = cache.get(digest_key)
+                # The object may have been deleted since; upload it again then
+                if stored_name and self.exists(stored_name):
+                    return stored_name
+
             # Check if this is an image file
             if self._is_image_file(name):
                 # Optimize the image
@@ -23,27 +79,26 @@ class DebugS3Storage(S3Boto3Storage):
             
             # Continue with the standard saving process
             content.seek(0)
-            file_content = content.read()
-
-            # Create boto3 client
-            s3 = boto3.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-            )
 
-            # Upload with appropriate content type
-            s3.put_object(
-                Bucket=self.bucket_name,
-                Key=name,
-                Body=file_content,
-                ContentType=getattr(
-                    content, "content_type", "application/octet-stream"
-                ),
-                CacheControl="max-age=604800",  # 1 week cache
+            s3 = get_s3_client()
+
+            # Stream the upload (multipart above the threshold) with appropriate content type
+            s3.upload_fileobj(
+                content,
+                self.bucket_name,
+                name,
+                ExtraArgs={
+                    "ContentType": getattr(
+                        content, "content_type", "application/octet-stream"
+                    ),
+                    "CacheControl": "max-age=604800",  # 1 week cache
+                },
+                Config=self.transfer_config,  # settings.AWS_S3_TRANSFER_CONFIG
             )
 
+            if digest_key:
+                cache.set(digest_key, name, UPLOAD_DIGEST_CACHE_TIMEOUT)
+
             # Return the name for the database record
             return name
 
@@ -51,6 +106,47 @@ class DebugS3Storage(S3Boto3Storage):
             logger.error(f"Error in _save: {str(e)}")
             raise
 
+    def process_direct_upload(self, name):
+        """
+        Validate and optimize an image a client uploaded straight to the
+        bucket (presign_upload), which bypassed _save. Returns False and
+        deletes the object if it is not an acceptable image
+        """
+        s3 = get_s3_client()
+        head = s3.head_object(Bucket=self.bucket_name, Key=name)
+        content = BytesIO()
+        if head["ContentLength"] <= MAX_UPLOAD_BYTES:
+            s3.download_fileobj(self.bucket_name, name, content, Config=self.transfer_config)
+
+        if not _is_image_magic(content.getvalue()[:12]):
+            logger.warning(f"Deleting rejected direct upload {name}")
+            s3.delete_object(Bucket=self.bucket_name, Key=name)
+            return False
+
+        content.seek(0)
+        optimized_content = self._optimize_image(content)
+        if optimized_content:
+            s3.upload_fileobj(
+                optimized_content,
+                self.bucket_name,
+                name,
+                ExtraArgs={
+                    "ContentType": head.get("ContentType", "application/octet-stream"),
+                    "CacheControl": "max-age=604800",  # 1 week cache
+                },
+                Config=self.transfer_config,
+            )
+        return True
+
+    def _content_digest(self, content):
+        """SHA-256 of the upload, read in chunks"""
+        hasher = hashlib.sha256()
+        content.seek(0)
+        for chunk in iter(lambda: content.read(64 * 1024), b""):
+            hasher.update(chunk)
+        content.seek(0)
+        return hasher.hexdigest()
+
     def _is_image_file(self, name):
         """Check if the file is an image based on extension"""
         image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
@@ -61,23 +157,13 @@ class DebugS3Storage(S3Boto3Storage):
         try:
             # Open image with PIL
             img = Image.open(content)
-            
-            # If image is very large, resize it
-            max_dimension = 1600  # Max width or height
-            if img.width > max_dimension or img.height > max_dimension:
-                # Calculate new dimensions maintaining aspect ratio
-                if img.width > img.height:
-                    new_width = max_dimension
-                    new_height = int(img.height * (max_dimension / img.width))
-                else:
-                    new_height = max_dimension
-                    new_width = int(img.width * (max_dimension / img.height))
-                
-                # Resize the image
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Determine format
+
+            # Determine format before any resampling, which drops it
             format = img.format
+
+            # If image is very large, shrink it in place, maintaining aspect ratio
+            max_dimension = 1600  # Max width or height
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
             
             # Create new BytesIO object for the optimized image
             optimized_content = BytesIO()
@@ -87,6 +173,14 @@ class DebugS3Storage(S3Boto3Storage):
                 img.save(optimized_content, format='JPEG', quality=85, optimize=True)
             elif format == 'PNG':
                 img.save(optimized_content, format='PNG', optimize=True)
+            elif format == 'WEBP':
+                # Encoded once, served many times: trade encode time for smaller files
+                img.save(
+                    optimized_content,
+                    format='WEBP',
+                    quality=getattr(settings, "WEBP_QUALITY", 82),
+                    method=getattr(settings, "WEBP_METHOD", 6),
+                )
             else:
                 # For other formats, maintain original
                 img.save(optimized_content, format=format)
@@ -1,6 +1,141 @@
+import smtplib
+
 from celery import shared_task
 from django.core.management import call_command
 
+# Transient mail failures are retried with exponential backoff
+EMAIL_RETRY_OPTIONS = {
+    "autoretry_for": (smtplib.SMTPException, ConnectionError),
+    "retry_backoff": True,
+    "max_retries": 5,
+}
+
 @shared_task
 def update_auction_winners():
-    call_command('update_auction_winners')
\ No newline at end of file
+    call_command('update_auction_winners')
+
+
+@shared_task(ignore_result=True, **EMAIL_RETRY_OPTIONS)
+def send_verification_email_task(user_id):
+    """Email a user the link for their current verification token"""
+    from .models import User
+    from .views import deliver_verification_email
+
+    # Reads the token the view committed and never issues a new one, so a
+    # retried or redelivered task sends the same link
+    user = (
+        User.objects.filter(pk=user_id, email_verified=False)
+        .only("email", "username", "verification_token")
+        .first()
+    )
+    if user is None or not user.verification_token:
+        return
+
+    deliver_verification_email(user)
+
+
+@shared_task(ignore_result=True, **EMAIL_RETRY_OPTIONS)
+def send_outbid_notification_task(user_id, item_id, previous_bid, new_bid):
+    """Email a user who has been outbid, if they still want those emails"""
+    from .models import Item, User
+    from .views import send_outbid_notification
+
+    user = User.objects.filter(pk=user_id, outbid_notifications_enabled=True).first()
+    if user is None:
+        return
+
+    item = Item.objects.select_related("category").filter(pk=item_id).first()
+    if item is None:
+        return
+
+    send_outbid_notification(user, item, previous_bid, new_bid)
+
+
+@shared_task(ignore_result=True)
+def mark_messages_read(user_id, from_staff):
+    """
+    Mark a conversation read. from_staff=True marks the admin messages a user
+    has received; False marks the user's messages to admin
+    """
+    from .models import Message
+    from .signals import invalidate_conversation_cache
+
+    if from_staff:
+        unread = Message.objects.filter(sender__is_staff=True, receiver_id=user_id, is_read=False)
+    else:
+        unread = Message.objects.filter(sender_id=user_id, receiver__isnull=True, is_read=False)
+
+    if unread.update(is_read=True):
+        invalidate_conversation_cache(user_id)
+
+
+@shared_task(ignore_result=True)
+def process_uploaded_image(image_id):
+    """Validate and optimize an image confirmed through confirm_upload"""
+    from django.core.files.storage import default_storage
+
+    from .models import ItemImage
+
+    image = ItemImage.objects.filter(pk=image_id).first()
+    if image is None:
+        return
+
+    if not default_storage.process_direct_upload(image.image.name):
+        # post_delete drops the cached item responses that listed it
+        image.delete()
+
+
+@shared_task(ignore_result=True)
+def refresh_analytics_rollups():
+    """Recompute the monthly sales and daily bid rollups behind the analytics dashboard"""
+    from django.db import transaction
+    from django.db.models import Count, Sum
+    from django.db.models.functions import TruncDay, TruncMonth
+    from django.utils import timezone
+
+    from .models import Bid, DailyBidRollup, Item, MonthlySalesRollup
+
+    monthly = [
+        MonthlySalesRollup(
+            month=row["month"].date(), revenue=row["revenue"] or 0, items_sold=row["items_sold"]
+        )
+        for row in Item.objects.filter(end_date__lt=timezone.now())
+        .annotate(month=TruncMonth("end_date"))
+        .values("month")
+        .annotate(revenue=Sum("current_price"), items_sold=Count("id"))
+        .order_by()
+    ]
+    daily = [
+        DailyBidRollup(day=row["day"].date(), count=row["count"])
+        for row in Bid.objects.annotate(day=TruncDay("created_at"))
+        .values("day")
+        .annotate(count=Count("id"))
+        .order_by()
+    ]
+
+    with transaction.atomic():
+        MonthlySalesRollup.objects.bulk_create(
+            monthly,
+            update_conflicts=True,
+            unique_fields=["month"],
+            update_fields=["revenue", "items_sold", "updated_at"],
+        )
+        MonthlySalesRollup.objects.exclude(month__in=[row.month for row in monthly]).delete()
+
+        DailyBidRollup.objects.bulk_create(
+            daily,
+            update_conflicts=True,
+            unique_fields=["day"],
+            update_fields=["count", "updated_at"],
+        )
+        DailyBidRollup.objects.exclude(day__in=[row.day for row in daily]).delete()
+
+
+@shared_task(ignore_result=True)
+def flush_attempt_audit():
+    """Write buffered login/bid attempt records to the database in batches"""
+    from .audit import BID_ATTEMPTS_QUEUE, LOGIN_ATTEMPTS_QUEUE, flush_queue
+    from .models import BidAttempt, LoginAttempt
+
+    flush_queue(LOGIN_ATTEMPTS_QUEUE, LoginAttempt)
+    flush_queue(BID_ATTEMPTS_QUEUE, BidAttempt)
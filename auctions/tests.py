@@ -1,3 +1,749 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Bid, Category, Item, ItemImage
+from .signals import ITEM_CACHE_VERSION_KEY, item_cache_version
+
+TEST_PASSWORD = "Str0ng!Passw0rd"
+
+class AuctionFixtures:
+    """Helpers for users and items in self.category"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.category = Category.objects.create(name="Knives", code="knife")
+
+    def make_user(self, username="bidder", **extra):
+        from .models import User
+
+        extra.setdefault("email_verified", True)
+        return User.objects.create_user(
+            username=username,
+            email=f"{username}@example.com",
+            password=TEST_PASSWORD,
+            nickname=username,
+            **extra,
+        )
+
+    def make_item(self, title="Hunting knife", price="100.00", **extra):
+        extra.setdefault("end_date", timezone.now() + timedelta(days=3))
+        return Item.objects.create(
+            category=self.category,
+            title=title,
+            description="A knife",
+            starting_price=Decimal(price),
+            current_price=Decimal(price),
+            **extra,
+        )
+
+
+class AuctionTestCase(AuctionFixtures, TestCase):
+    """Base test case with a clean cache, an API client and a category"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+
+class ItemCacheInvalidationTests(AuctionTestCase):
+    def test_invalidation_waits_for_commit(self):
+        version = item_cache_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.make_item()
+            # Still inside the transaction: the cached version is untouched
+            self.assertEqual(cache.get(ITEM_CACHE_VERSION_KEY), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cache.get(ITEM_CACHE_VERSION_KEY), version + 1)
+
+    @mock.patch("auctions.views.send_outbid_notification_task.delay")
+    def test_list_is_refreshed_after_bid(self, _delay):
+        item = self.make_item()
+        url = reverse("items-list")
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["current_price"], "100.00")
+
+        self.client.force_authenticate(self.make_user())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("items-place-bid", args=[item.pk]), {"amount": "150.00"}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["current_price"], "150.00")
+        self.assertEqual(Bid.objects.filter(item=item).count(), 1)
+
+
+def make_image_bytes(format="PNG", size=(32, 32)):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@mock.patch("auctions.storage.DebugS3Storage.exists", return_value=False)
+@mock.patch("auctions.storage.get_s3_client")
+class ImageStorageTests(AuctionTestCase):
+    def test_default_storage_is_optimizing_backend(self, _client, _exists):
+        from django.core.files.storage import storages
+
+        from .storage import DebugS3Storage
+
+        self.assertIsInstance(storages["default"], DebugS3Storage)
+        # Its own client (exists, delete, open) is tuned like get_s3_client's
+        self.assertIs(storages["default"].client_config, settings.AWS_S3_CLIENT_CONFIG)
+
+    def use_fake_bucket(self, get_client, exists):
+        """Back exists() with the names upload_fileobj has stored"""
+        bucket = set()
+        get_client.return_value.upload_fileobj.side_effect = (
+            lambda content, bucket_name, key, **kwargs: bucket.add(key)
+        )
+        exists.side_effect = bucket.__contains__
+        return bucket
+
+    def test_identical_uploads_are_stored_once(self, get_client, exists):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        self.use_fake_bucket(get_client, exists)
+        data = make_image_bytes()
+        first = default_storage.save("images/first.png", ContentFile(data))
+        second = default_storage.save("images/second.png", ContentFile(data))
+
+        self.assertEqual(first, "images/first.png")
+        self.assertEqual(second, first)
+        get_client.return_value.upload_fileobj.assert_called_once()
+
+    def test_deleted_duplicate_is_uploaded_again(self, get_client, exists):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        bucket = self.use_fake_bucket(get_client, exists)
+        data = make_image_bytes()
+        default_storage.save("images/first.png", ContentFile(data))
+        bucket.discard("images/first.png")
+        second = default_storage.save("images/second.png", ContentFile(data))
+
+        self.assertEqual(second, "images/second.png")
+        self.assertEqual(get_client.return_value.upload_fileobj.call_count, 2)
+
+    def test_non_image_upload_is_rejected(self, get_client, _exists):
+        from django.core.exceptions import SuspiciousFileOperation
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        with self.assertRaises(SuspiciousFileOperation):
+            default_storage.save("images/evil.png", ContentFile(b"<?php echo 1; ?>"))
+        get_client.return_value.upload_fileobj.assert_not_called()
+
+    def test_oversized_upload_is_rejected(self, get_client, _exists):
+        from django.core.exceptions import SuspiciousFileOperation
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        with mock.patch("auctions.storage.MAX_UPLOAD_BYTES", 16):
+            with self.assertRaises(SuspiciousFileOperation):
+                default_storage.save("images/big.png", ContentFile(make_image_bytes()))
+        get_client.return_value.upload_fileobj.assert_not_called()
+
+    def test_webp_upload_is_resized_and_reencoded(self, get_client, _exists):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from PIL import Image
+
+        uploaded = {}
+
+        def capture(fileobj, *args, **kwargs):
+            uploaded["data"] = fileobj.read()
+
+        get_client.return_value.upload_fileobj.side_effect = capture
+        original_save = Image.Image.save
+
+        with mock.patch.object(
+            Image.Image, "save", autospec=True, side_effect=original_save
+        ) as save:
+            default_storage.save(
+                "images/wide.webp", ContentFile(make_image_bytes("WEBP", (3200, 1600)))
+            )
+
+        self.assertEqual(save.call_args.kwargs["quality"], settings.WEBP_QUALITY)
+        self.assertEqual(save.call_args.kwargs["method"], settings.WEBP_METHOD)
+        stored = Image.open(BytesIO(uploaded["data"]))
+        self.assertEqual(stored.format, "WEBP")
+        self.assertEqual(stored.size, (1600, 800))
+
+    def test_upload_is_streamed_with_upload_fileobj(self, get_client, _exists):
+        from django.core.files.storage import default_storage
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile("photo.png", make_image_bytes(), "image/png")
+        default_storage.save("images/photo.png", upload)
+
+        s3 = get_client.return_value
+        s3.put_object.assert_not_called()
+        args, kwargs = s3.upload_fileobj.call_args
+        self.assertEqual(args[1:], (default_storage.bucket_name, "images/photo.png"))
+        self.assertEqual(kwargs["ExtraArgs"]["ContentType"], "image/png")
+
+    def test_upload_uses_project_transfer_config(self, get_client, _exists):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        default_storage.save("images/photo.png", ContentFile(make_image_bytes()))
+
+        kwargs = get_client.return_value.upload_fileobj.call_args.kwargs
+        self.assertIs(kwargs["Config"], settings.AWS_S3_TRANSFER_CONFIG)
+
+
+class PastAuctionsTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("past_auctions")
+        now = timezone.now()
+        self.finished = [
+            self.make_item(f"Finished {n}", end_date=now - timedelta(days=n))
+            for n in range(1, 4)
+        ]
+        self.make_item("Still running")
+
+    def test_cursor_pages_walk_finished_items(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        titles = [row["title"] for row in response.data["results"]]
+        self.assertEqual(titles, ["Finished 1", "Finished 2"])
+
+        response = self.client.get(response.data["next"])
+        titles = [row["title"] for row in response.data["results"]]
+        self.assertEqual(titles, ["Finished 3"])
+        self.assertIsNone(response.data["next"])
+
+    def add_image_and_bid(self, item, bidder):
+        ItemImage.objects.create(item=item, image=f"images/{item.pk}.png", order=0)
+        Bid.objects.create(item=item, user=bidder, amount=item.current_price + 10)
+
+    def test_full_list_query_count_does_not_grow_with_items(self):
+        from django.test.utils import CaptureQueriesContext
+
+        bidder = self.make_user()
+        self.add_image_and_bid(self.finished[0], bidder)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data[0]["images"]), 1)
+
+        for item in self.finished[1:]:
+            self.add_image_and_bid(item, bidder)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url)
+        self.assertTrue(all(len(row["images"]) == 1 for row in response.data))
+        self.assertEqual(len(many), len(few))
+
+    def test_cursor_rows_carry_images_and_category(self):
+        self.add_image_and_bid(self.finished[0], self.make_user())
+
+        response = self.client.get(self.url, {"page_size": 1, "category": "knife"})
+        row = response.data["results"][0]
+        self.assertEqual(row["id"], self.finished[0].pk)
+        self.assertEqual(row["category_code"], "knife")
+        self.assertEqual(row["current_price"], "100.00")
+        self.assertEqual([image["order"] for image in row["images"]], [0])
+
+        response = self.client.get(self.url, {"page_size": 1, "category": "paint"})
+        self.assertEqual(response.data["results"], [])
+
+
+class CachedFieldsMixinTests(AuctionTestCase):
+    def test_instances_get_their_own_bound_fields(self):
+        from .serializers import ItemListSerializer
+
+        first = ItemListSerializer(context={"name": "first"})
+        second = ItemListSerializer(context={"name": "second"})
+
+        self.assertEqual(first.fields.keys(), second.fields.keys())
+        for name in first.fields:
+            self.assertIsNot(first.fields[name], second.fields[name])
+            self.assertIs(first.fields[name].parent, first)
+            self.assertIs(second.fields[name].parent, second)
+
+    def test_nested_serializers_see_their_own_root(self):
+        from .serializers import ItemDetailSerializer
+
+        first = ItemDetailSerializer(context={"name": "first"})
+        second = ItemDetailSerializer(context={"name": "second"})
+
+        self.assertIs(first.fields["bids"].child.root, first)
+        self.assertIs(second.fields["bids"].child.root, second)
+        self.assertEqual(second.fields["bids"].child.context["name"], "second")
+
+    def test_subclass_builds_its_own_fields(self):
+        from rest_framework import serializers as drf_serializers
+
+        from .serializers import ItemListSerializer
+
+        class WithExtra(ItemListSerializer):
+            extra = drf_serializers.CharField(default="x")
+
+            class Meta(ItemListSerializer.Meta):
+                fields = [*ItemListSerializer.Meta.fields, "extra"]
+
+        ItemListSerializer().fields
+        self.assertIn("extra", WithExtra().fields)
+        self.assertNotIn("extra", ItemListSerializer().fields)
+
+
+@mock.patch("auctions.views.send_outbid_notification_task.delay")
+class PlaceBidTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = self.make_item()
+        self.url = reverse("items-place-bid", args=[self.item.pk])
+        self.client.force_authenticate(self.make_user())
+
+    def bid(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {"amount": amount}, format="json")
+
+    def test_bid_below_increment_is_rejected(self, _delay):
+        response = self.bid("100.50")
+        self.assertEqual(response.status_code, 400)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_price, Decimal("100.00"))
+
+    def test_bid_against_stale_price_conflicts(self, _delay):
+        from .views import ItemViewSet
+
+        # Another bid commits between this request's read and its UPDATE
+        stale = Item.objects.get(pk=self.item.pk)
+        Item.objects.filter(pk=self.item.pk).update(current_price=Decimal("200.00"))
+
+        with mock.patch.object(ItemViewSet, "get_object", return_value=stale):
+            response = self.bid("150.00")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Bid.objects.exists())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_price, Decimal("200.00"))
+
+    @mock.patch("auctions.views.queue_bid_attempt")
+    def test_successful_attempt_is_queued_after_commit(self, queue_attempt, _delay):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, {"amount": "150.00"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        queue_attempt.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        queue_attempt.assert_called_once_with(mock.ANY, mock.ANY, success=True)
+
+    def test_outbid_user_is_notified_after_commit(self, delay):
+        rival = self.make_user("rival")
+        Bid.objects.create(item=self.item, user=rival, amount=Decimal("120.00"))
+        Item.objects.filter(pk=self.item.pk).update(current_price=Decimal("120.00"))
+
+        response = self.bid("130.00")
+
+        self.assertEqual(response.status_code, 201)
+        delay.assert_called_once_with(rival.pk, self.item.pk, "120.00", "130.00")
+
+
+class LoginRateLimitTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.url = reverse("login")
+
+    def login(self, password, **extra):
+        return self.client.post(
+            self.url, {"email": self.user.email, "password": password, **extra}, format="json"
+        )
+
+    def test_captcha_follows_the_rate_limit_counter(self):
+        # No flush of the audit buffer: the counter alone must trigger it
+        for _ in range(3):
+            self.assertEqual(self.login("wrong").status_code, 401)
+
+        response = self.login(TEST_PASSWORD)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data["captcha_required"])
+
+        response = self.login(TEST_PASSWORD, captcha_response="token")
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_session_is_stored_server_side_and_revoked_on_logout(self):
+        from django.contrib.sessions.models import Session
+
+        response = self.login(TEST_PASSWORD)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("session_key", response.data)
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertTrue(Session.objects.filter(session_key=session_key).exists())
+
+        self.client.post(reverse("logout"))
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+
+    @override_settings(RECAPTCHA_ENABLED=True)
+    def test_captcha_is_verified_when_enabled(self):
+        for _ in range(3):
+            self.login("wrong")
+
+        with mock.patch("auctions.views._recaptcha_session.post") as post:
+            post.return_value.json.return_value = {"success": False}
+            response = self.login(TEST_PASSWORD, captcha_response="forged")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "Invalid CAPTCHA response.")
+
+    @override_settings(RECAPTCHA_ENABLED=True)
+    def test_solved_captcha_is_not_replayable(self):
+        from .views import verify_recaptcha
+
+        with mock.patch("auctions.views._recaptcha_session.post") as post:
+            post.return_value.json.return_value = {"success": True}
+            self.assertTrue(verify_recaptcha("token"))
+            post.return_value.json.return_value = {"success": False}
+            self.assertFalse(verify_recaptcha("token"))
+            self.assertFalse(verify_recaptcha("token"))
+        # The replay reaches Google; only its rejection is served from cache
+        self.assertEqual(post.call_count, 2)
+
+    def test_failed_logins_are_rate_limited(self):
+        for _ in range(5):
+            self.login("wrong", captcha_response="token")
+
+        response = self.login(TEST_PASSWORD, captcha_response="token")
+        self.assertEqual(response.status_code, 429)
+
+
+class AuditFlushTests(AuctionTestCase):
+    def test_failed_insert_keeps_the_batch_queued(self):
+        from django_redis import get_redis_connection
+
+        from .audit import LOGIN_ATTEMPTS_QUEUE, flush_queue, queue_login_attempt
+        from .models import LoginAttempt
+
+        queue_login_attempt("a@example.com", "127.0.0.1", success=False)
+        queue_login_attempt("b@example.com", "127.0.0.1", success=True)
+
+        with mock.patch.object(
+            LoginAttempt.objects, "bulk_create", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                flush_queue(LOGIN_ATTEMPTS_QUEUE, LoginAttempt)
+        self.assertEqual(get_redis_connection("default").llen(LOGIN_ATTEMPTS_QUEUE), 2)
+
+        self.assertEqual(flush_queue(LOGIN_ATTEMPTS_QUEUE, LoginAttempt), 2)
+        self.assertEqual(get_redis_connection("default").llen(LOGIN_ATTEMPTS_QUEUE), 0)
+        self.assertEqual(
+            sorted(LoginAttempt.objects.values_list("email", flat=True)),
+            ["a@example.com", "b@example.com"],
+        )
+
+    def test_flush_outliving_its_lock_still_returns_the_count(self):
+        from django_redis import get_redis_connection
+
+        from .audit import LOGIN_ATTEMPTS_QUEUE, flush_queue, queue_login_attempt
+        from .models import LoginAttempt
+
+        queue_login_attempt("a@example.com", "127.0.0.1", success=False)
+        bulk_create = LoginAttempt.objects.bulk_create
+
+        def expire_lock_then_insert(*args, **kwargs):
+            get_redis_connection("default").delete(f"{LOGIN_ATTEMPTS_QUEUE}:flush_lock")
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(
+            LoginAttempt.objects, "bulk_create", side_effect=expire_lock_then_insert
+        ):
+            self.assertEqual(flush_queue(LOGIN_ATTEMPTS_QUEUE, LoginAttempt), 1)
+        self.assertEqual(LoginAttempt.objects.count(), 1)
+
+
+class ItemListETagTests(AuctionTestCase):
+    def test_etag_survives_a_refill_with_unchanged_items(self):
+        self.make_item()
+        url = reverse("items-list")
+
+        etag = self.client.get(url)["ETag"]
+        cache.clear()
+        self.assertEqual(self.client.get(url)["ETag"], etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_the_items(self):
+        item = self.make_item()
+        url = reverse("items-list")
+        etag = self.client.get(url)["ETag"]
+
+        item.current_price = Decimal("120.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save(update_fields=["current_price"])
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+    def test_version_is_read_with_a_single_get(self):
+        item_cache_version()
+        with mock.patch.object(cache, "add") as add:
+            self.assertEqual(item_cache_version(), 1)
+        add.assert_not_called()
+
+
+class AuctionMetricsTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = self.make_user("admin", is_staff=True)
+        self.client.force_authenticate(admin)
+        self.url = reverse("auction_metrics")
+        now = timezone.now()
+        date_from = now - timedelta(days=30)
+        item = self.make_item()
+
+        # Either side of the window start, whole days inside it, and today
+        for created_at in [
+            date_from - timedelta(hours=1),
+            date_from + timedelta(hours=1),
+            now - timedelta(days=10),
+            now - timedelta(days=10, hours=2),
+            now - timedelta(days=2),
+            now - timedelta(minutes=1),
+        ]:
+            bid = Bid.objects.create(item=item, user=admin, amount=Decimal("110.00"))
+            Bid.objects.filter(pk=bid.pk).update(created_at=created_at)
+
+        for n, end_date in enumerate(
+            [
+                date_from - timedelta(hours=1),
+                date_from + timedelta(hours=1),
+                now - timedelta(days=20),
+                now - timedelta(hours=1),
+                now + timedelta(days=1),
+            ]
+        ):
+            self.make_item(f"Sold {n}", price=f"{10 * (n + 1)}.00", end_date=end_date)
+
+    def live_metrics(self):
+        """What the dashboard computed before the rollups"""
+        from django.db.models import Count, Sum
+        from django.db.models.functions import TruncDay, TruncMonth
+
+        now = timezone.now()
+        date_from = now - timedelta(days=30)
+        bids = (
+            Bid.objects.filter(created_at__gte=date_from)
+            .annotate(date=TruncDay("created_at"))
+            .values("date")
+            .annotate(count=Count("id"))
+            .order_by("date")
+        )
+        sales = (
+            Item.objects.filter(end_date__lt=now, end_date__gte=date_from)
+            .annotate(month=TruncMonth("end_date"))
+            .values("month")
+            .annotate(sales=Sum("current_price"))
+            .order_by("month")
+        )
+        return list(bids), list(sales)
+
+    def assert_matches_live_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        bids, sales = self.live_metrics()
+        self.assertEqual(response.data["bids_over_time"], bids)
+        self.assertEqual(response.data["monthly_sales"], sales)
+        return response
+
+    def test_matches_live_query_before_first_refresh(self):
+        self.assert_matches_live_query()
+
+    def test_matches_live_query_after_refresh(self):
+        from .models import DailyBidRollup
+        from .tasks import refresh_analytics_rollups
+
+        refresh_analytics_rollups()
+        self.assertTrue(DailyBidRollup.objects.exists())
+        response = self.assert_matches_live_query()
+        self.assertTrue(
+            all(isinstance(row["date"], datetime) for row in response.data["bids_over_time"])
+        )
+
+    def test_closed_days_are_read_from_rollups(self):
+        from .models import DailyBidRollup
+        from .tasks import refresh_analytics_rollups
+
+        refresh_analytics_rollups()
+        ten_days_ago = timezone.localdate() - timedelta(days=10)
+        DailyBidRollup.objects.filter(day=ten_days_ago).update(count=99)
+
+        response = self.client.get(self.url)
+        counts = {row["date"].date(): row["count"] for row in response.data["bids_over_time"]}
+        self.assertEqual(counts[ten_days_ago], 99)
+
+
+@mock.patch("auctions.views.get_s3_client")
+class DirectUploadTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = self.make_item()
+        self.client.force_authenticate(self.make_user("admin", is_staff=True))
+
+    def presign(self, pk, filenames):
+        return self.client.post(
+            reverse("items-presign-upload", args=[pk]), {"filenames": filenames}, format="json"
+        )
+
+    def confirm(self, keys):
+        return self.client.post(
+            reverse("items-confirm-upload", args=[self.item.pk]), {"keys": keys}, format="json"
+        )
+
+    def test_presign_signs_a_size_limited_post_per_file(self, get_client):
+        from .storage import MAX_UPLOAD_BYTES
+
+        s3 = get_client.return_value
+        s3.generate_presigned_post.return_value = {"url": "https://s3", "fields": {"key": "k"}}
+
+        response = self.presign(self.item.pk, ["front.png", "back.JPG"])
+
+        self.assertEqual(response.status_code, 200)
+        keys = [upload["key"] for upload in response.data["uploads"]]
+        self.assertTrue(all(key.startswith(f"images/{self.item.pk}/") for key in keys))
+        self.assertTrue(keys[1].endswith(".jpg"))
+        conditions = s3.generate_presigned_post.call_args.kwargs["Conditions"]
+        self.assertIn(["content-length-range", 1, MAX_UPLOAD_BYTES], conditions)
+        self.assertIn({"Content-Type": "image/jpeg"}, conditions)
+
+    def test_presign_rejects_bad_requests(self, get_client):
+        self.assertEqual(self.presign(self.item.pk + 1, ["a.png"]).status_code, 404)
+        self.assertEqual(self.presign(self.item.pk, "a.png").status_code, 400)
+        self.assertEqual(self.presign(self.item.pk, [{"name": "a.png"}]).status_code, 400)
+        self.assertEqual(self.presign(self.item.pk, ["a.exe"]).status_code, 400)
+        get_client.return_value.generate_presigned_post.assert_not_called()
+
+    def test_confirm_rejects_keys_outside_the_item_prefix(self, get_client):
+        other = self.make_item("Other")
+        for keys in [
+            f"images/{self.item.pk}/{'a' * 32}.png",
+            [f"images/{other.pk}/{'a' * 32}.png"],
+            [f"images/{'a' * 32}.png"],
+            [f"images/{self.item.pk}/../{'a' * 32}.png"],
+        ]:
+            self.assertEqual(self.confirm(keys).status_code, 400)
+        get_client.return_value.head_object.assert_not_called()
+        self.assertFalse(ItemImage.objects.exists())
+
+    @mock.patch("auctions.views.process_uploaded_image.delay")
+    def test_confirm_creates_images_and_queues_processing(self, delay, get_client):
+        keys = [f"images/{self.item.pk}/{n * 32}.png" for n in "ab"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.confirm(keys)
+
+        self.assertEqual(response.status_code, 201)
+        images = list(ItemImage.objects.filter(item=self.item).order_by("order"))
+        self.assertEqual([image.image.name for image in images], keys)
+        self.assertEqual(delay.call_args_list, [mock.call(image.pk) for image in images])
+
+
+@mock.patch("auctions.storage.get_s3_client")
+class ProcessUploadedImageTests(AuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.image = ItemImage.objects.create(
+            item=self.make_item(), image=f"images/1/{'a' * 32}.png", order=0
+        )
+
+    def stub_object(self, s3, data):
+        s3.head_object.return_value = {"ContentLength": len(data), "ContentType": "image/png"}
+        s3.download_fileobj.side_effect = lambda bucket, key, fileobj, **kwargs: fileobj.write(
+            data
+        )
+
+    def test_non_image_is_deleted(self, get_client):
+        from .tasks import process_uploaded_image
+
+        s3 = get_client.return_value
+        self.stub_object(s3, b"<html>not an image</html>")
+
+        process_uploaded_image(self.image.pk)
+
+        s3.delete_object.assert_called_once_with(Bucket=mock.ANY, Key=self.image.image.name)
+        self.assertFalse(ItemImage.objects.filter(pk=self.image.pk).exists())
+
+    def test_image_is_optimized_in_place(self, get_client):
+        from .tasks import process_uploaded_image
+
+        s3 = get_client.return_value
+        self.stub_object(s3, make_image_bytes())
+
+        process_uploaded_image(self.image.pk)
+
+        s3.delete_object.assert_not_called()
+        args, kwargs = s3.upload_fileobj.call_args
+        self.assertEqual(args[2], self.image.image.name)
+        self.assertEqual(kwargs["ExtraArgs"]["ContentType"], "image/png")
+        self.assertTrue(ItemImage.objects.filter(pk=self.image.pk).exists())
+
+
+# SQLite serializes writers with a database lock, so the losing thread fails
+# on locking rather than on the guarded UPDATE this test is about
+@unittest.skipUnless(connection.vendor == "postgresql", "needs concurrent row-level writes")
+@mock.patch("auctions.views.send_outbid_notification_task.delay")
+class ConcurrentBidTests(AuctionFixtures, TransactionTestCase):
+    """Two bids racing on real connections; the guarded UPDATE lets one through"""
+
+    def test_second_of_two_racing_bids_conflicts(self, _delay):
+        import threading
+
+        from .views import ItemViewSet
+
+        item = self.make_item()
+        users = [self.make_user(name) for name in ("first", "second")]
+
+        # Both requests read the item before either updates it
+        barrier = threading.Barrier(2, timeout=10)
+        get_object = ItemViewSet.get_object
+
+        def get_object_then_wait(view):
+            obj = get_object(view)
+            barrier.wait()
+            return obj
+
+        statuses = []
+
+        def bid(user):
+            try:
+                client = APIClient()
+                client.force_authenticate(user)
+                response = client.post(
+                    reverse("items-place-bid", args=[item.pk]), {"amount": "150.00"}, format="json"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        with mock.patch.object(ItemViewSet, "get_object", get_object_then_wait):
+            threads = [threading.Thread(target=bid, args=(user,)) for user in users]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(statuses), [201, 409])
+        self.assertEqual(Bid.objects.filter(item=item).count(), 1)
+        item.refresh_from_db()
+        self.assertEqual(item.current_price, Decimal("150.00"))
@@ -15,6 +15,8 @@ router.register(r"paint", views.PaintItemViewSet, basename="paint-items")
 router.register(r"misc", views.MiscItemViewSet, basename="misc-items")
 
 urlpatterns = [
+    # Ahead of the router, whose items/<pk>/ route would otherwise claim it
+    path("items/past/", views.past_auctions, name="past_auctions"),
     path("", include(router.urls)),
     path("csrf/", views.get_csrf_token, name="csrf"),
     path("register/", views.register_user, name="register"),
@@ -36,7 +38,6 @@ urlpatterns = [
     path("analytics/auctions/", views_analytics.auction_metrics, name="auction_metrics"),
     path("analytics/top-items/", views_analytics.top_items, name="top_items"),
     path("check-nickname/", views.check_nickname_availability, name="check_nickname"),
-    path("items/past/", views.past_auctions, name="past_auctions"),
     path("admin/recent-winners/", views.recent_winners, name="admin_recent_winners"),
     path("admin/user-won-items/<int:user_id>/", views.user_won_items, name="user_won_items"),
     path("admin/winner-ids/", views.winner_ids, name="winner_ids"),
@@ -1,27 +1,36 @@
 # auctions/views.py
 
+import hashlib
 import json
 import logging
+import mimetypes
 import os
+import re
+import secrets
 import time
 import uuid
+from collections import defaultdict
 from datetime import timedelta
 from decimal import Decimal, InvalidOperation
-from functools import wraps
+from functools import lru_cache, wraps
 
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.core.cache import cache
 from django.core.files.storage import default_storage
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.paginator import Paginator
 from django.db import models, transaction
 from django.db.models import Avg, Count, F, Max, Min, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.http import HttpResponse
 from django.middleware.csrf import get_token
-from django.template.loader import render_to_string
+from django.template.loader import get_template
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.views.decorators.csrf import ensure_csrf_cookie
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
@@ -31,18 +40,36 @@ from rest_framework.exceptions import Throttled
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Bid, BidAttempt, Category, Item, ItemImage, LoginAttempt, Message, User
-from .pagination import OptimizedPagination
+from .audit import queue_bid_attempt, queue_login_attempt
+from .models import Bid, Category, Item, ItemImage, Message, User
+from .pagination import OptimizedPagination, PastAuctionsCursorPagination
+from .rate_limit import record_event, sliding_window_count, window_count
 from .serializers import (
     BidSerializer,
     CategorySerializer,
     GoogleAuthSerializer,
     ItemDetailSerializer,
+    ItemImageSerializer,
     ItemListSerializer,
     LoginSerializer,
     MessageSerializer,
     UserRegistrationSerializer,
     UserSerializer,
+    build_image_url,
+)
+from .signals import (
+    chat_cache_key,
+    conversations_cache_key,
+    invalidate_conversation_cache,
+    invalidate_item_cache,
+    item_cache_version,
+)
+from .storage import MAX_UPLOAD_BYTES, get_s3_client
+from .tasks import (
+    mark_messages_read,
+    process_uploaded_image,
+    send_outbid_notification_task,
+    send_verification_email_task,
 )
 
 # Setup logger
@@ -51,12 +78,36 @@ logger = logging.getLogger(__name__)
 # Constants for rate limiting
 MAX_LOGIN_ATTEMPTS = 5  # Max attempts per 15 minutes
 LOGIN_ATTEMPT_PERIOD = 15 * 60  # 15 minutes in seconds
+CAPTCHA_AFTER_FAILED_LOGINS = 3  # Failed attempts in the same window before CAPTCHA
 MAX_BID_ATTEMPTS = 10  # Max bid attempts per minute
 BID_ATTEMPT_PERIOD = 60  # 1 minute in seconds
 
+# Shared keep-alive session so CAPTCHA checks reuse the TLS connection to Google
+RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+_recaptcha_session = requests.Session()
+_recaptcha_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=20))
+# Only rejections are cached, to cheaply turn away retries of a bad token;
+# tokens are single-use, so a cached success would make a solved CAPTCHA replayable
+RECAPTCHA_INVALID_CACHE_TIMEOUT = 10 * 60  # 10 minutes
+
 # Cache timeouts
 MEDIUM_CACHE_TIMEOUT = 5 * 60  # 5 minutes
 SHORT_CACHE_TIMEOUT = 60  # 1 minute
+NICKNAME_CACHE_TIMEOUT = 10  # 10 seconds
+CONVERSATION_CACHE_TIMEOUT = 30  # 30 seconds
+MARK_READ_DEBOUNCE = 5  # 5 seconds
+
+# Profile fields update_profile can write directly, without the full serializer
+SIMPLE_PREFERENCE_FIELDS = {"outbid_notifications_enabled", "win_notifications_enabled"}
+
+# Direct-to-S3 image uploads
+PRESIGNED_UPLOAD_EXPIRY = 15 * 60  # 15 minutes
+IMAGE_UPLOAD_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+MAX_PRESIGNED_UPLOADS = 10  # Files per presign_upload request
+# Keys are scoped to the item: images/<item id>/<random hex>.<ext>
+IMAGE_UPLOAD_KEY_RE = re.compile(
+    r"^images/(?P<item_id>\d+)/[0-9a-f]{32}\.(jpg|jpeg|png|gif|webp)$"
+)
 
 
 # Cache decorator for views
@@ -86,90 +137,110 @@ def cache_response(timeout=MEDIUM_CACHE_TIMEOUT):
 # Helper functions
 def verify_recaptcha(recaptcha_response):
     """Verify reCAPTCHA response"""
-    # For development, always return True
-    return True
+    # For development, always return True unless verification is switched on
+    if not settings.RECAPTCHA_ENABLED:
+        return True
+
+    if not recaptcha_response:
+        return False
+
+    token_hash = hashlib.blake2b(recaptcha_response.encode(), digest_size=16).hexdigest()
+    cache_key = f"recaptcha:{token_hash}"
+    if cache.get(cache_key) is not None:
+        return False
 
     try:
-        payload = {"secret": recaptcha_secret, "response": recaptcha_response}
-        response = requests.post(recaptcha_url, data=payload)
+        payload = {"secret": settings.RECAPTCHA_SECRET_KEY, "response": recaptcha_response}
+        response = _recaptcha_session.post(RECAPTCHA_VERIFY_URL, data=payload, timeout=3)
         result = response.json()
-        return result.get("success", False)
+        success = bool(result.get("success", False))
     except Exception as e:
+        # Network failures are not cached; the next submit verifies again
         logger.error(f"reCAPTCHA verification error: {str(e)}")
         return False
 
+    if not success:
+        cache.set(cache_key, False, RECAPTCHA_INVALID_CACHE_TIMEOUT)
+    return success
+
 
-def check_login_rate_limit(email, ip_address):
-    """Check if login attempts exceed rate limit"""
-    # Use a cache key to avoid database hits for frequent checks
-    cache_key = f"login_attempts_{email}_{ip_address}"
-    attempts = cache.get(cache_key)
+def login_rate_key(email, ip_address):
+    """Rate limit key for failed logins of an email from an IP"""
+    return f"rl:login:{email}:{ip_address}"
 
-    if attempts is None:
-        cutoff_time = timezone.now() - timedelta(seconds=LOGIN_ATTEMPT_PERIOD)
-        attempts = LoginAttempt.objects.filter(
-            email=email, ip_address=ip_address, timestamp__gte=cutoff_time, success=False
-        ).count()
-        cache.set(cache_key, attempts, 60)  # Cache for 1 minute
 
-    return attempts >= MAX_LOGIN_ATTEMPTS
+def record_failed_login(email, ip_address):
+    """Store a failed login attempt and count it against the rate limit"""
+    queue_login_attempt(email, ip_address, success=False)
+    record_event(login_rate_key(email, ip_address), LOGIN_ATTEMPT_PERIOD)
+
+
+def failed_login_count(email, ip_address):
+    """Failed login attempts of an email from an IP in the sliding window"""
+    return window_count(login_rate_key(email, ip_address), LOGIN_ATTEMPT_PERIOD)
 
 
 def check_bid_rate_limit(user, ip_address):
-    """Check if bid attempts exceed rate limit"""
-    # Use a cache key to avoid database hits for frequent checks
-    cache_key = f"bid_attempts_{getattr(user, 'id', 'anonymous')}_{ip_address}"
-    attempts = cache.get(cache_key)
+    """Count this bid attempt and check if attempts in the sliding window exceed rate limit"""
+    key = f"rl:bid:{getattr(user, 'id', None) or ip_address}"
+    attempts = sliding_window_count(key, BID_ATTEMPT_PERIOD, record=True)
+    return attempts >= MAX_BID_ATTEMPTS
 
-    if attempts is None:
-        cutoff_time = timezone.now() - timedelta(seconds=BID_ATTEMPT_PERIOD)
-        query = {"ip_address": ip_address, "timestamp__gte": cutoff_time}
 
-        if user and user.is_authenticated:
-            query["user"] = user
+@lru_cache(maxsize=None)
+def _compiled_template(name):
+    return get_template(name)
 
-        attempts = BidAttempt.objects.filter(**query).count()
-        cache.set(cache_key, attempts, 30)  # Cache for 30 seconds
 
-    return attempts >= MAX_BID_ATTEMPTS
+def email_template(name):
+    """Email template by name, looked up and compiled once per process outside DEBUG"""
+    if settings.DEBUG:
+        # Keep picking up template edits during development
+        return get_template(name)
+    return _compiled_template(name)
 
 
 def send_verification_email(user):
-    """Send email verification to user"""
+    """Issue a new verification token and queue the verification email"""
     # Generate verification token
-    token = uuid.uuid4().hex
+    token = secrets.token_urlsafe(24)
+    token_expires = timezone.now() + timedelta(hours=24)
+    # Plain UPDATE of the two columns; nothing listens to User saves
+    User.objects.filter(pk=user.pk).update(
+        verification_token=token, verification_token_expires=token_expires
+    )
     user.verification_token = token
-    user.verification_token_expires = timezone.now() + timedelta(hours=24)
-    user.save(update_fields=["verification_token", "verification_token_expires"])
+    user.verification_token_expires = token_expires
+
+    # Send from the worker once the token is committed
+    user_id = user.id
+    transaction.on_commit(lambda: send_verification_email_task.delay(user_id))
+    return True
 
+
+def deliver_verification_email(user):
+    """Render and send the verification email for the user's current token"""
     # Build verification URL
     frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:5173")
-    verification_url = f"{frontend_url}/verify-email/{token}"
+    verification_url = f"{frontend_url}/verify-email/{user.verification_token}"
 
     # Build email context
     context = {"user": user, "verification_url": verification_url, "expiry_hours": 24}
 
     # Create email body
-    html_message = render_to_string("emails/email_verification.html", context)
+    html_message = email_template("emails/email_verification.html").render(context)
     plain_message = f"Please verify your email by clicking this link: {verification_url}"
 
-    # Send email
-    try:
-        send_mail(
-            subject="Verify your email for Alaska Auctions",
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        print(f"Verification email sent to {user.email} with token {token}")
-        print(f"Verification URL: {verification_url}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send verification email: {str(e)}")
-        print(f"Failed to send verification email: {str(e)}")
-        return False
+    # Send email; failures propagate so the task can retry
+    send_mail(
+        subject="Verify your email for Alaska Auctions",
+        message=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        html_message=html_message,
+        fail_silently=False,
+    )
+    logger.info("Verification email sent to user %s", user.id)
 
 
 @api_view(["GET"])
@@ -195,10 +266,35 @@ def past_auctions(request):
         if category:
             query &= Q(category__code=category)
 
-        # Get items
-        items = Item.objects.filter(query).order_by("-end_date")
+        # Cursor pagination when the client asks for it, full list otherwise.
+        # Pages are plain dicts - no model instances or serializer per row
+        if "cursor" in request.query_params or "page_size" in request.query_params:
+            paginator = PastAuctionsCursorPagination()
+            page = paginator.paginate_queryset(
+                Item.objects.filter(query)
+                .order_by("-end_date", "-id")
+                .values("id", "title", "current_price", "end_date", "category__code", "winner_id"),
+                request,
+            )
+
+            # One query for the images of every item on the page
+            images_by_item = defaultdict(list)
+            for image in (
+                ItemImage.objects.filter(item_id__in=[row["id"] for row in page])
+                .order_by("order")
+                .values("id", "item_id", "image", "order")
+            ):
+                images_by_item[image["item_id"]].append(
+                    {"id": image["id"], "image": build_image_url(image["image"]), "order": image["order"]}
+                )
+
+            for row in page:
+                row["current_price"] = str(row["current_price"])
+                row["category_code"] = row.pop("category__code")
+                row["images"] = images_by_item[row["id"]]
+            return paginator.get_paginated_response(page)
 
-        # Simple response without pagination (easier to debug)
+        items = Item.objects.with_full_relations().filter(query).order_by("-end_date", "-id")
         serializer = ItemDetailSerializer(items, many=True)
         return Response(serializer.data)
 
@@ -258,10 +354,14 @@ def login_view(request):
     # Add debug logging
     print(f"Login attempt for email: {email} from IP: {ip_address}")
 
+    # One read of the rate limit counter drives both the limit and the CAPTCHA;
+    # the buffered LoginAttempt rows lag behind it
+    failed_attempts = failed_login_count(email, ip_address)
+
     # Check rate limit
-    if check_login_rate_limit(email, ip_address):
+    if failed_attempts >= MAX_LOGIN_ATTEMPTS:
         # Record failed attempt
-        LoginAttempt.objects.create(email=email, ip_address=ip_address, success=False)
+        record_failed_login(email, ip_address)
 
         print(f"Rate limit exceeded for {email}")
         return Response(
@@ -270,15 +370,7 @@ def login_view(request):
         )
 
     # Check if captcha is required (for suspicious activity)
-    captcha_required = (
-        LoginAttempt.objects.filter(
-            email=email,
-            ip_address=ip_address,
-            timestamp__gte=timezone.now() - timedelta(hours=24),
-            success=False,
-        ).count()
-        >= 3
-    )
+    captcha_required = failed_attempts >= CAPTCHA_AFTER_FAILED_LOGINS
 
     if captcha_required and not request.data.get("captcha_response"):
         print(f"CAPTCHA required for {email}")
@@ -289,7 +381,7 @@ def login_view(request):
 
     if captcha_required and not verify_recaptcha(request.data.get("captcha_response")):
         # Record failed attempt
-        LoginAttempt.objects.create(email=email, ip_address=ip_address, success=False)
+        record_failed_login(email, ip_address)
 
         print(f"Invalid CAPTCHA for {email}")
         return Response({"detail": "Invalid CAPTCHA response."}, status=status.HTTP_400_BAD_REQUEST)
@@ -304,7 +396,7 @@ def login_view(request):
         # Check for email verification
         if not user.email_verified:
             # Record failed attempt
-            LoginAttempt.objects.create(email=email, ip_address=ip_address, success=False)
+            record_failed_login(email, ip_address)
 
             print(f"Email not verified for {email}")
 
@@ -336,29 +428,27 @@ def login_view(request):
             # Save the session explicitly
             request.session.save()
 
-            print(f"Login successful for {email}, session key: {request.session.session_key}")
+            print(f"Login successful for {email}")
 
             # Record successful login
-            LoginAttempt.objects.create(email=email, ip_address=ip_address, success=True)
+            queue_login_attempt(email, ip_address, success=True)
 
             return Response(
                 {
                     "user": UserSerializer(user).data,
                     "message": "Login successful",
-                    # Include session key for debugging (optional)
-                    "session_key": request.session.session_key,
                 }
             )
         else:
             # Record failed attempt
-            LoginAttempt.objects.create(email=email, ip_address=ip_address, success=False)
+            record_failed_login(email, ip_address)
 
             print(f"Invalid password for {email}")
             return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
     except User.DoesNotExist:
         # Record failed attempt
-        LoginAttempt.objects.create(email=email, ip_address=ip_address, success=False)
+        record_failed_login(email, ip_address)
 
         print(f"User not found for email: {email}")
         return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
@@ -428,7 +518,7 @@ def google_auth(request):
                 user.google_id = google_id
                 if not user.profile_picture and "picture" in id_info:
                     user.profile_picture = id_info["picture"]
-                user.save()
+                user.save(update_fields=["google_id", "profile_picture"])
             except User.DoesNotExist:
                 # Create new user
                 logger.info(f"Creating new user for: {email}")
@@ -439,6 +529,15 @@ def google_auth(request):
                     username = f"{email.split('@')[0]}{counter}"
                     counter += 1
 
+                # Collect optional profile fields up front so the user is written once
+                profile_fields = {}
+                if "name" in id_info:
+                    profile_fields["full_name"] = id_info["name"]
+                if "given_name" in id_info:
+                    profile_fields["nickname"] = id_info["given_name"]
+                if "picture" in id_info:
+                    profile_fields["profile_picture"] = id_info["picture"]
+
                 try:
                     user = User.objects.create(
                         username=username,
@@ -446,16 +545,8 @@ def google_auth(request):
                         google_id=google_id,
                         email_verified=True,
                         is_active=True,
+                        **profile_fields,
                     )
-
-                    if "name" in id_info:
-                        user.full_name = id_info["name"]
-                    if "given_name" in id_info:
-                        user.nickname = id_info["given_name"]
-                    if "picture" in id_info:
-                        user.profile_picture = id_info["picture"]
-
-                    user.save()
                     logger.info(f"Created new user: {username}")
                 except Exception as create_error:
                     logger.error(f"Error creating user: {str(create_error)}", exc_info=True)
@@ -585,21 +676,7 @@ class ItemViewSet(viewsets.ModelViewSet):
     pagination_class = OptimizedPagination
 
     def get_queryset(self):
-        """Get optimized queryset for items with caching"""
-        # Check if user is authenticated
-        is_authenticated = self.request.user.is_authenticated
-
-        # Generate cache key based on request parameters
-        request_path = self.request.path
-        query_params = self.request.query_params.urlencode()
-        cache_key = f"item_queryset:{request_path}:{query_params}"
-
-        # Try to get from cache first for anonymous users
-        if not is_authenticated:
-            cached_queryset = cache.get(cache_key)
-            if cached_queryset is not None:
-                return cached_queryset
-
+        """Get optimized queryset for items"""
         # Define base queryset with optimizations
         if self.action == "list":
             # For list views, optimize with select_related and only fetch necessary fields
@@ -615,9 +692,20 @@ class ItemViewSet(viewsets.ModelViewSet):
                 "category__code",
             )
 
-            # Add annotations for bid count to avoid additional queries
+            # Add annotations for bid count to avoid additional queries.
+            # Correlated subqueries keep the outer query join-free (no GROUP BY
+            # over a bids join, no row multiplication)
             queryset = queryset.annotate(
-                bid_count=Count("bids", distinct=True),
+                bid_count=Coalesce(
+                    Subquery(
+                        Bid.objects.filter(item=OuterRef("pk"))
+                        .order_by()
+                        .values("item")
+                        .annotate(c=Count("pk"))
+                        .values("c")[:1]
+                    ),
+                    0,
+                ),
                 first_image_id=Subquery(
                     ItemImage.objects.filter(item=OuterRef("pk")).order_by("order").values("id")[:1]
                 ),
@@ -639,16 +727,15 @@ class ItemViewSet(viewsets.ModelViewSet):
             if active_only and not show_past:
                 queryset = queryset.filter(is_active=True)
 
-            # Cache the queryset for anonymous users
-            if not is_authenticated:
-                cache.set(cache_key, queryset, MEDIUM_CACHE_TIMEOUT * 2)
-
             return queryset
+        elif self.action == "place_bid":
+            # Bidding only needs the item row and its category; the price
+            # itself is settled by the guarded UPDATE in place_bid
+            return Item.objects.select_related("category")
         else:
-            # For detail views, include all related data
-            return Item.objects.select_related("category", "winner").prefetch_related(
-                "images", "bids", "bids__user"
-            )
+            # For detail views, include all related data - but only the
+            # columns the nested image/bid serializers actually read
+            return Item.objects.with_full_relations()
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -658,40 +745,215 @@ class ItemViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             permission_classes = [AllowAny]
+        elif self.action in ["presign_upload", "confirm_upload"]:
+            permission_classes = [IsAuthenticated, IsAdminUser]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def _cache_key(self, kind, *parts):
+        """Build a versioned Redis key for a cached item response"""
+        category_code = getattr(self, "category_code", "")
+        return ":".join(
+            ["items", f"v{item_cache_version()}", kind, category_code, *(str(part) for part in parts)]
+        )
+
     def retrieve(self, request, *args, **kwargs):
-        """Override retrieve to optimize and cache responses"""
-        # Simply return the standard response without caching
-        return super().retrieve(request, *args, **kwargs)
+        """Serve item details from Redis, falling back to the ORM on a miss"""
+        cache_key = self._cache_key("detail", kwargs.get(self.lookup_field, ""))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
+        response = super().retrieve(request, *args, **kwargs)
+        cache.set(cache_key, response.data, SHORT_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def _list_etag(data):
+        """
+        ETag derived from the page contents, so a refill with unchanged items
+        keeps it. time_remaining ticks every second and follows from end_date,
+        which is hashed anyway
+        """
+        rows = data.get("results", []) if isinstance(data, dict) else data
+        stable = [
+            {field: value for field, value in row.items() if field != "time_remaining"}
+            for row in rows
+        ]
+        if isinstance(data, dict):
+            stable = {**data, "results": stable}
+        payload = json.dumps(stable, sort_keys=True, cls=DjangoJSONEncoder)
+        return f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
 
     def list(self, request, *args, **kwargs):
-        """Override list to optimize and cache responses"""
-        # Simply return the standard response without caching
-        return super().list(request, *args, **kwargs)
+        """
+        Serve list pages from Redis, falling back to the ORM on a miss. Each
+        cached page carries an ETag so clients can revalidate with a 304
+        """
+        params = request.query_params
+        cache_key = self._cache_key(
+            "list",
+            params.get("category", ""),
+            params.get("active", ""),
+            params.get("show_past", ""),
+            f"p{params.get('page', 1)}",
+            f"s{params.get('page_size', '')}",
+        )
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            cached = {"etag": self._list_etag(response.data), "data": response.data}
+            cache.set(cache_key, cached, SHORT_CACHE_TIMEOUT)
+
+        if request.headers.get("If-None-Match") == cached["etag"]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(cached["data"])
+        response["ETag"] = cached["etag"]
+        return response
+
+    @staticmethod
+    def _item_exists(pk):
+        """Existence check for upload actions, which need no item columns"""
+        return str(pk).isdigit() and Item.objects.filter(pk=pk).exists()
+
+    @action(detail=True, methods=["post"])
+    def presign_upload(self, request, pk=None):
+        """
+        Return presigned S3 POST forms so clients upload images straight to
+        the bucket. The signed policy pins the key, the content type and the
+        size range, so S3 itself rejects anything else
+        """
+        if not self._item_exists(pk):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        filenames = request.data.get("filenames")
+        if (
+            not isinstance(filenames, list)
+            or not filenames
+            or not all(isinstance(filename, str) for filename in filenames)
+        ):
+            return Response(
+                {"detail": "filenames must be a non-empty list of file names."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(filenames) > MAX_PRESIGNED_UPLOADS:
+            return Response(
+                {"detail": f"At most {MAX_PRESIGNED_UPLOADS} files per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        s3 = get_s3_client()
+        uploads = []
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in IMAGE_UPLOAD_EXTENSIONS:
+                return Response(
+                    {"detail": f"Unsupported image type: {filename}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            key = f"images/{pk}/{uuid.uuid4().hex}{ext}"
+            content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            post = s3.generate_presigned_post(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=key,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, MAX_UPLOAD_BYTES],
+                ],
+                ExpiresIn=PRESIGNED_UPLOAD_EXPIRY,
+            )
+            uploads.append(
+                {
+                    "filename": filename,
+                    "key": key,
+                    "url": post["url"],
+                    "fields": post["fields"],
+                    "content_type": content_type,
+                }
+            )
+
+        return Response({"uploads": uploads, "expires_in": PRESIGNED_UPLOAD_EXPIRY})
+
+    @action(detail=True, methods=["post"])
+    def confirm_upload(self, request, pk=None):
+        """
+        Create image records for objects uploaded through presign_upload. Each
+        image is then validated and optimized by a background task
+        """
+        if not self._item_exists(pk):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        keys = request.data.get("keys")
+        if not isinstance(keys, list) or not keys:
+            return Response(
+                {"detail": "keys must be a non-empty list of upload keys."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Only keys presign_upload could have issued for this item
+        invalid_keys = []
+        for key in keys:
+            match = IMAGE_UPLOAD_KEY_RE.match(key) if isinstance(key, str) else None
+            if not match or match["item_id"] != str(pk):
+                invalid_keys.append(key)
+        if invalid_keys or len(set(keys)) != len(keys):
+            return Response(
+                {"detail": "Invalid upload keys.", "keys": invalid_keys},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Make sure every object actually landed in the bucket
+        s3 = get_s3_client()
+        missing_keys = []
+        for key in keys:
+            try:
+                s3.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+            except s3.exceptions.ClientError:
+                missing_keys.append(key)
+        if missing_keys:
+            return Response(
+                {"detail": "Some uploads were not found.", "keys": missing_keys},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Append after any existing images
+        last_order = ItemImage.objects.filter(item_id=pk).aggregate(last=Max("order"))["last"]
+        first_order = 0 if last_order is None else last_order + 1
+
+        images = ItemImage.objects.bulk_create(
+            [
+                ItemImage(item_id=pk, image=key, order=first_order + index)
+                for index, key in enumerate(keys)
+            ]
+        )
+        # bulk_create skips post_save, so drop cached item responses explicitly
+        invalidate_item_cache()
+
+        # The objects skipped _save, so check and optimize them out of band
+        def queue_processing():
+            for image in images:
+                process_uploaded_image.delay(image.pk)
+
+        transaction.on_commit(queue_processing)
+
+        return Response(
+            ItemImageSerializer(images, many=True).data, status=status.HTTP_201_CREATED
+        )
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
     def place_bid(self, request, pk=None):
         """Place a bid on an item"""
+        if check_bid_rate_limit(request.user, request.META.get("REMOTE_ADDR", "")):
+            return Response(
+                {"detail": "Too many bid attempts. Please wait a minute and try again."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
         try:
-            item = self.get_object()
-            
-            # Check if auction is active
-            if not item.is_active:
-                return Response(
-                    {"detail": "This auction is not active."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-                
-            # Check if auction has ended
-            if item.end_date < timezone.now():
-                return Response(
-                    {"detail": "This auction has ended."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-                
             # Get bid amount from request
             amount = request.data.get("amount")
             if not amount:
@@ -700,58 +962,100 @@ class ItemViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
                 
-            # Convert to decimal
+            # Convert to decimal once; strings and ints parse directly, floats go
+            # through str() so binary artifacts don't leak into the amount
             try:
-                amount = Decimal(str(amount))
-            except (ValueError, InvalidOperation):
+                amount = Decimal(amount) if isinstance(amount, (int, str)) else Decimal(str(amount))
+                if not amount.is_finite():
+                    raise InvalidOperation
+            except (TypeError, ValueError, InvalidOperation):
                 return Response(
                     {"detail": "Invalid bid amount."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+
+            with transaction.atomic():
+                item = self.get_object()
                 
-            # Check if bid is higher than current price
-            if amount <= item.current_price:
-                return Response(
-                    {"detail": f"Bid must be higher than current price (${item.current_price})."},
-                    status=status.HTTP_400_BAD_REQUEST,
+                # Check if auction is active
+                if not item.is_active:
+                    return Response(
+                        {"detail": "This auction is not active."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                    
+                # Check if auction has ended
+                if item.end_date < timezone.now():
+                    return Response(
+                        {"detail": "This auction has ended."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                    
+                # Check if bid is higher than current price
+                if amount <= item.current_price:
+                    return Response(
+                        {"detail": f"Bid must be higher than current price (${item.current_price})."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                    
+                # Check if bid is at least $1 higher than current price
+                if amount < item.current_price + 1:
+                    return Response(
+                        {"detail": "Minimum bid increment is $1.00."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                    
+                # The checks above ran against a snapshot. The guarded UPDATE
+                # re-checks the increment against the committed price and holds
+                # the row lock until commit; no row means another bid got there
+                # first
+                updated = Item.objects.filter(
+                    pk=item.pk, current_price__lte=amount - 1
+                ).update(current_price=amount)
+                if not updated:
+                    return Response(
+                        {"detail": "A higher bid was placed first. Please refresh and try again."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                item.current_price = amount
+
+                # Read under the row lock, so this is the bid being outbid
+                # (only what the notification needs)
+                previous_highest_bid = (
+                    Bid.objects.filter(item=item)
+                    .only("id", "amount", "user_id")
+                    .order_by("-amount")
+                    .first()
                 )
-                
-            # Check if bid is at least $1 higher than current price
-            if amount < item.current_price + 1:
-                return Response(
-                    {"detail": "Minimum bid increment is $1.00."},
-                    status=status.HTTP_400_BAD_REQUEST,
+
+                # Create bid
+                bid = Bid.objects.create(
+                    user=request.user,
+                    item=item,
+                    amount=amount,
                 )
                 
-            # Create bid
-            bid = Bid.objects.create(
-                user=request.user,
-                item=item,
-                amount=amount,
-            )
-            
-            # Update item's current price
-            item.current_price = amount
-            item.save()
-            
-            # Record bid attempt
-            BidAttempt.objects.create(
-                user=request.user,
-                ip_address=request.META.get("REMOTE_ADDR", ""),
-                success=True,
-            )
-            
-            # Notify previous highest bidder if they exist and have notifications enabled
-            previous_highest_bid = Bid.objects.filter(item=item).exclude(id=bid.id).order_by("-amount").first()
-            if previous_highest_bid and previous_highest_bid.user != request.user:
-                if previous_highest_bid.user.outbid_notifications_enabled:
-                    send_outbid_notification(
-                        previous_highest_bid.user,
-                        item,
-                        previous_highest_bid.amount,
-                        amount,
+                # Record the successful attempt once the bid has committed
+                attempt_args = (request.user.id, request.META.get("REMOTE_ADDR", ""))
+                transaction.on_commit(lambda: queue_bid_attempt(*attempt_args, success=True))
+
+                # Queue the outbid email for the previous highest bidder once the
+                # bid commits; the task checks their notification preference
+                if (
+                    previous_highest_bid
+                    and previous_highest_bid.user_id
+                    and previous_highest_bid.user_id != request.user.id
+                ):
+                    notify_args = (
+                        previous_highest_bid.user_id,
+                        item.id,
+                        str(previous_highest_bid.amount),
+                        str(amount),
                     )
-            
+                    transaction.on_commit(
+                        lambda: send_outbid_notification_task.delay(*notify_args)
+                    )
+
             return Response(
                 {
                     "detail": "Bid placed successfully.",
@@ -762,18 +1066,13 @@ class ItemViewSet(viewsets.ModelViewSet):
             )
         except Exception as e:
             # Record failed attempt
-            BidAttempt.objects.create(
-                user=request.user,
-                ip_address=request.META.get("REMOTE_ADDR", ""),
-                success=False,
-            )
+            queue_bid_attempt(request.user.id, request.META.get("REMOTE_ADDR", ""), success=False)
             
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def check_nickname_availability(request):
@@ -786,10 +1085,24 @@ def check_nickname_availability(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Check if nickname exists
-    exists = User.objects.filter(nickname=nickname).exists()
+    # Signup forms check on every keystroke; absorb repeated lookups briefly
+    cache_key = f"nickname:available:{nickname}"
+    available = cache.get(cache_key)
+    if available is None:
+        # nickname is unique, so this is a single index lookup
+        available = not User.objects.filter(nickname=nickname).exists()
+        cache.set(cache_key, available, NICKNAME_CACHE_TIMEOUT)
+
+    return Response({"nickname": nickname, "available": available})
 
-    return Response({"nickname": nickname, "available": not exists})
+
+def queue_mark_read(user_id, from_staff):
+    """
+    Mark a conversation read in the background, at most once per
+    MARK_READ_DEBOUNCE seconds, so chat polling stays read-only
+    """
+    if cache.add(f"messages:mark-read:{user_id}:{int(from_staff)}", True, MARK_READ_DEBOUNCE):
+        mark_messages_read.delay(user_id, from_staff)
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -798,6 +1111,17 @@ class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
 
+    def _messages(self):
+        """Messages with only the columns MessageSerializer reads"""
+        return Message.objects.select_related("sender", "receiver").only(
+            "id",
+            "content",
+            "created_at",
+            "is_read",
+            "sender__username",
+            "receiver__username",
+        )
+
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
@@ -811,98 +1135,109 @@ class MessageViewSet(viewsets.ModelViewSet):
         """Handle message creation with improved debugging and error handling"""
         try:
             user = request.user
-            print(
-                f"Message creation request from user: {user.username} (is_staff: {user.is_staff})"
-            )
-            print(f"Request data: {request.data}")
-
-            # Prepare data for serialization
-            message_data = request.data.copy()
-
-            # Always set the sender to the current user
-            message_data["sender"] = user.id
-
-            # Handle receiver properly based on user type
-            if user.is_staff and "receiver" in request.data and request.data["receiver"]:
-                # Admin sending to specific user - use the provided receiver
-                receiver_id = request.data["receiver"]
-                print(f"Admin sending message to user ID: {receiver_id}")
-
-                # Verify the receiver exists
-                try:
-                    receiver = User.objects.get(id=receiver_id)
-                    print(f"Verified receiver exists: {receiver.username}")
-                except User.DoesNotExist:
-                    return Response(
-                        {"detail": f"Receiver with ID {receiver_id} does not exist."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            elif not user.is_staff:
-                # Regular user sending to admin - set receiver to null
-                message_data["receiver"] = None
-                print(f"User sending message to admin (receiver=null)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Message creation request from user: %s (is_staff: %s), data: %s",
+                    user.username,
+                    user.is_staff,
+                    request.data,
+                )
 
-            print(f"Final message data for serializer: {message_data}")
+            # Build exactly what the serializer needs: the sender is always the
+            # current user; regular users always write to admin (receiver=null)
+            message_data = {
+                "sender": user.id,
+                "content": request.data.get("content"),
+                "receiver": (request.data.get("receiver") or None) if user.is_staff else None,
+            }
 
-            # Create the serializer with our prepared data
+            # Create the serializer with our prepared data; its receiver
+            # PrimaryKeyRelatedField rejects users that don't exist
             serializer = self.get_serializer(data=message_data)
 
             if not serializer.is_valid():
-                print(f"Serializer validation errors: {serializer.errors}")
+                logger.debug("Message serializer validation errors: %s", serializer.errors)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
             # Save the message
             message = serializer.save()
-            print(f"Message created successfully: {message.id}")
+            logger.debug("Message created successfully: %s", message.id)
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            print(f"Error creating message: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("Error creating message: %s", e)
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=["get"])
     def my_conversations(self, request):
         """Get conversations for current user"""
         user = request.user
+        cache_key = conversations_cache_key(user)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self._conversations(user)
+            cache.set(cache_key, data, CONVERSATION_CACHE_TIMEOUT)
+
+        # Chat UIs poll this; let the browser reuse it briefly but never share it
+        response = Response(data)
+        patch_cache_control(response, private=True, max_age=10)
+        return response
+
+    def _conversations(self, user):
+        """Build the my_conversations payload for a user"""
         if user.is_staff:
-            # For admins, get all unique users who have sent messages
-            senders = User.objects.filter(sent_messages__receiver__isnull=True).distinct()
-
-            # Get latest message for each sender
-            conversations = []
-            for sender in senders:
-                # Get all messages between this user and admin
-                all_messages = Message.objects.filter(
-                    models.Q(sender=sender, receiver__isnull=True)
-                    | models.Q(sender__is_staff=True, receiver=sender)
-                ).order_by("-created_at")
-
-                # Get the latest message separately
-                latest_message = all_messages.first()
-
-                if latest_message:
-                    # Count unread messages in a separate query
-                    unread_count = Message.objects.filter(
-                        sender=sender, receiver__isnull=True, is_read=False
-                    ).count()
-
-                    conversations.append(
-                        {
-                            "user": UserSerializer(sender).data,
-                            "latest_message": MessageSerializer(latest_message).data,
-                            "unread_count": unread_count,
-                        }
-                    )
+            # For admins, get all unique users who have sent messages, annotated
+            # with their latest conversation message and unread count
+            latest_message = (
+                Message.objects.filter(
+                    models.Q(sender=OuterRef("pk"), receiver__isnull=True)
+                    | models.Q(sender__is_staff=True, receiver=OuterRef("pk"))
+                )
+                .order_by("-created_at")
+                .values("id")[:1]
+            )
+            unread = (
+                Message.objects.filter(sender=OuterRef("pk"), receiver__isnull=True, is_read=False)
+                .order_by()
+                .values("sender")
+                .annotate(c=Count("pk"))
+                .values("c")
+            )
+            senders = (
+                User.objects.filter(sent_messages__receiver__isnull=True)
+                .distinct()
+                .annotate(
+                    latest_message_id=Subquery(latest_message),
+                    unread_count=Coalesce(Subquery(unread), 0),
+                )
+            )
 
-            return Response(conversations)
+            # Fetch all latest messages in one query
+            senders = list(senders)
+            latest_messages = self._messages().in_bulk(
+                [sender.latest_message_id for sender in senders if sender.latest_message_id]
+            )
+
+            # Serialize each side in one pass instead of one serializer per row
+            senders = [sender for sender in senders if sender.latest_message_id in latest_messages]
+            messages = [latest_messages[sender.latest_message_id] for sender in senders]
+            users_data = UserSerializer(senders, many=True).data
+            messages_data = MessageSerializer(messages, many=True).data
+
+            conversations = [
+                {
+                    "user": user_data,
+                    "latest_message": message_data,
+                    "unread_count": sender.unread_count,
+                }
+                for sender, user_data, message_data in zip(senders, users_data, messages_data)
+            ]
+
+            return conversations
         else:
             # For regular users, get their conversation with admin
-            all_messages = Message.objects.filter(
+            all_messages = self._messages().filter(
                 models.Q(sender=user, receiver__isnull=True)
                 | models.Q(sender__is_staff=True, receiver=user)
             ).order_by("-created_at")
@@ -915,12 +1250,10 @@ class MessageViewSet(viewsets.ModelViewSet):
                 sender__is_staff=True, receiver=user, is_read=False
             ).count()
 
-            return Response(
-                {
-                    "messages": MessageSerializer(messages, many=True).data,
-                    "unread_count": unread_count,
-                }
-            )
+            return {
+                "messages": MessageSerializer(messages, many=True).data,
+                "unread_count": unread_count,
+            }
 
     @action(detail=False, methods=["get"])
     def admin_chat(self, request):
@@ -929,17 +1262,22 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         # Mark messages as read
         if not user.is_staff:
-            Message.objects.filter(sender__is_staff=True, receiver=user, is_read=False).update(
-                is_read=True
-            )
+            queue_mark_read(user.id, from_staff=True)
 
-        # Get messages
-        messages = Message.objects.filter(
-            models.Q(sender=user, receiver__isnull=True)
-            | models.Q(sender__is_staff=True, receiver=user)
-        ).order_by("created_at")
+        cache_key = chat_cache_key(user)
+        data = cache.get(cache_key)
+        if data is None:
+            # Get messages
+            messages = self._messages().filter(
+                models.Q(sender=user, receiver__isnull=True)
+                | models.Q(sender__is_staff=True, receiver=user)
+            ).order_by("created_at")
+            data = MessageSerializer(messages, many=True).data
+            cache.set(cache_key, data, CONVERSATION_CACHE_TIMEOUT)
 
-        return Response(MessageSerializer(messages, many=True).data)
+        response = Response(data)
+        patch_cache_control(response, private=True, max_age=10)
+        return response
 
     @action(detail=False, methods=["get"])
     def user_chat(self, request, user_id=None):
@@ -955,12 +1293,10 @@ class MessageViewSet(viewsets.ModelViewSet):
             user = User.objects.get(id=user_id)
 
             # Mark messages as read
-            Message.objects.filter(sender=user, receiver__isnull=True, is_read=False).update(
-                is_read=True
-            )
+            queue_mark_read(user.id, from_staff=False)
 
             # Get messages
-            messages = Message.objects.filter(
+            messages = self._messages().filter(
                 models.Q(sender=user, receiver__isnull=True)
                 | models.Q(sender__is_staff=True, receiver=user)
             ).order_by("created_at")
@@ -1011,8 +1347,24 @@ class UserViewSet(viewsets.ModelViewSet):
     def update_profile(self, request):
         """Update user profile including notification preferences"""
         user = request.user
-        print(f"Updating profile for user: {user.email}")
-        print(f"Received data: {request.data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Updating profile for user: %s, data: %s", user.email, request.data)
+
+        # Fast path for notification toggles: one UPDATE of just those columns
+        if request.data and set(request.data) <= SIMPLE_PREFERENCE_FIELDS:
+            try:
+                changes = {
+                    field: serializers.BooleanField().to_internal_value(request.data[field])
+                    for field in request.data
+                }
+            except serializers.ValidationError:
+                changes = None
+
+            if changes is not None:
+                User.objects.filter(pk=user.pk).update(**changes)
+                for field, value in changes.items():
+                    setattr(user, field, value)
+                return Response(self.get_serializer(user).data)
 
         # Create a serializer with the user and data
         serializer = self.get_serializer(user, data=request.data, partial=True)
@@ -1020,10 +1372,9 @@ class UserViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             # Save the updated user
             serializer.save()
-            print(f"Profile updated successfully: {serializer.data}")
             return Response(serializer.data)
 
-        print(f"Profile update validation errors: {serializer.errors}")
+        logger.debug("Profile update validation errors: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -1060,11 +1411,12 @@ def debug_send_message(request):
 def recent_winners(request):
     """Get recent auction winners for admin dashboard"""
     # Get items that have ended with a winner set
-    recent_winners = Item.objects.filter(
-        winner__isnull=False, end_date__lt=timezone.now()
-    ).order_by("-end_date")[
-        :10
-    ]  # Last 10 winners
+    recent_winners = (
+        Item.objects.select_related("winner")
+        .only("id", "title", "current_price", "end_date", "winner__email", "winner__nickname")
+        .filter(winner__isnull=False, end_date__lt=timezone.now())
+        .order_by("-end_date")[:10]
+    )  # Last 10 winners
 
     result = []
     for item in recent_winners:
@@ -1147,40 +1499,45 @@ def contact_winners(request):
         if not item_ids:
             return Response({"detail": "No items selected"}, status=status.HTTP_400_BAD_REQUEST)
 
-        contacted = 0
-        for item_id in item_ids:
-            try:
-                item = Item.objects.get(pk=item_id)
-                if item.winner and not item.winner_notified:
-                    # Check if winner has enabled win notifications
-                    if item.winner.win_notifications_enabled:
-                        # Send email notification
-                        send_winner_notification(item)
-
-                    # Create message in system (always send in-app message regardless of email preferences)
-                    Message.objects.create(
-                        sender=request.user,
-                        receiver=item.winner,
-                        content=f"Congratulations! You've won the auction for {item.title} with a bid of ${item.current_price}. Please respond to arrange payment and shipping details.",
-                    )
+        # Fetch every selected item (and its winner) in a single query
+        items = list(
+            Item.objects.select_related("winner").filter(
+                pk__in=item_ids, winner__isnull=False, winner_notified=False
+            )
+        )
+
+        # Email winners who have enabled win notifications, all over one connection
+        send_winner_notifications(
+            [item for item in items if item.winner.win_notifications_enabled]
+        )
 
-                    item.winner_notified = True
-                    item.winner_contacted = timezone.now()
-                    item.save()
-                    contacted += 1
-            except Item.DoesNotExist:
-                continue
+        # Create messages in system (always send in-app message regardless of email preferences)
+        Message.objects.bulk_create(
+            [
+                Message(
+                    sender=request.user,
+                    receiver=item.winner,
+                    content=f"Congratulations! You've won the auction for {item.title} with a bid of ${item.current_price}. Please respond to arrange payment and shipping details.",
+                )
+                for item in items
+            ]
+        )
+        # bulk_create skips post_save, so drop the winners' cached conversations here
+        invalidate_conversation_cache(*[item.winner_id for item in items])
+
+        contacted = Item.objects.filter(pk__in=[item.pk for item in items]).update(
+            winner_notified=True, winner_contacted=timezone.now()
+        )
+        # Bulk updates bypass post_save, so drop cached item responses explicitly
+        invalidate_item_cache()
 
         return Response({"contacted": contacted})
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def send_winner_notification(item):
-    """Send email notification to auction winner"""
-    from django.conf import settings
-    from django.core.mail import send_mail
-
+def build_winner_notification(item):
+    """Build the email telling an auction winner they won"""
     subject = f"Congratulations! You've won the auction for {item.title}"
     message = f"""
     Dear {item.winner.nickname or item.winner.username},
@@ -1201,32 +1558,32 @@ def send_winner_notification(item):
     Mick Whipple 
     """
 
+    return EmailMultiAlternatives(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[item.winner.email],
+    )
+
+
+def send_winner_notifications(items):
+    """Send winner emails for several items over a single SMTP connection"""
+    messages = [build_winner_notification(item) for item in items]
+    if not messages:
+        return 0
+
     try:
-        print(f"Sending winner notification email to {item.winner.email}")
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[item.winner.email],
-            fail_silently=False,
-        )
-        print(f"Email sent successfully to {item.winner.email}")
-        return True
+        with get_connection() as connection:
+            sent = connection.send_messages(messages)
+        logger.info("Sent %s winner notification emails", sent)
+        return sent
     except Exception as e:
-        print(f"Error sending winner notification email: {str(e)}")
-        return False
+        logger.error(f"Error sending winner notification emails: {str(e)}")
+        return 0
 
 
 def send_outbid_notification(user, item, previous_bid, new_bid):
     """Send notification email to user who has been outbid"""
-    import logging
-
-    from django.conf import settings
-    from django.core.mail import send_mail
-    from django.template.loader import render_to_string
-
-    logger = logging.getLogger(__name__)
-
     subject = f"You've been outbid on {item.title}"
 
     # Create email context
@@ -1241,7 +1598,7 @@ def send_outbid_notification(user, item, previous_bid, new_bid):
     # Check if we have a template for the email
     try:
         # Try to render the HTML template
-        html_message = render_to_string("emails/outbid_notification.html", context)
+        html_message = email_template("emails/outbid_notification.html").render(context)
     except Exception as e:
         # If template doesn't exist, use None for the HTML version
         logger.warning(f"Outbid notification template not found: {str(e)}")
@@ -1275,7 +1632,7 @@ def send_outbid_notification(user, item, previous_bid, new_bid):
         return True
     except Exception as e:
         logger.error(f"Failed to send outbid notification: {str(e)}")
-        return False
+        raise
 
 
 @api_view(["POST"])
@@ -1349,15 +1706,6 @@ class CategorySpecificItemViewSet(ItemViewSet):
         if self.category_code:
             queryset = queryset.filter(category__code=self.category_code)
         return queryset
-        
-    # Ensure unauthenticated users can access item details
-    def get_permissions(self):
-        # Always allow list and retrieve operations
-        if self.action in ["list", "retrieve"]:
-            permission_classes = [AllowAny]
-        else:
-            permission_classes = [IsAuthenticated]
-        return [permission() for permission in permission_classes]
 
 
 class KnifeItemViewSet(CategorySpecificItemViewSet):
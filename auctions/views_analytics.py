@@ -1,64 +1,92 @@
-from django.db.models import Count, Sum, Avg, F, ExpressionWrapper, fields, Q
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum, Avg, F, ExpressionWrapper, fields, Max, Q
 from django.db.models.functions import TruncDay, TruncHour, TruncMonth
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from .models import User, Item, Bid, LoginAttempt, BidAttempt, Category
+from .models import (
+    User, Item, Bid, LoginAttempt, BidAttempt, Category, DailyBidRollup, MonthlySalesRollup
+)
+
+ANALYTICS_CACHE_TIMEOUT = 60  # 1 minute
+
+
+def cached_analytics(name, timeout=ANALYTICS_CACHE_TIMEOUT):
+    """
+    Cache an analytics view's response data per time range. Bumping
+    settings.ANALYTICS_VERSION invalidates every cached analytics response
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            time_range = request.query_params.get('timeRange', '30days')
+            version = getattr(settings, 'ANALYTICS_VERSION', 1)
+            cache_key = f"analytics:v{version}:{name}:{time_range}"
+            data = cache.get(cache_key)
+            if data is None:
+                data = view(request, *args, **kwargs).data
+                cache.set(cache_key, data, timeout)
+            return Response(data)
+        return wrapper
+    return decorator
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@cached_analytics('overview')
 def analytics_overview(request):
     """Provides top-level metrics for the dashboard"""
     
     # Calculate time range based on query param
-    time_range = request.query_params.get('timeRange', '30days')
-    date_from = calculate_date_range(time_range)
-    
-    # Total users
-    total_users = User.objects.count()
-    new_users = User.objects.filter(date_joined__gte=date_from).count()
-    
-    # Total items
-    total_items = Item.objects.count()
-    active_items = Item.objects.filter(is_active=True).count()
+    now, date_from = _get_range(request)
+    
+    # One aggregate query per table instead of one query per metric
+    users = User.objects.aggregate(
+        total=Count('id'),
+        new=Count('id', filter=Q(date_joined__gte=date_from))
+    )
+    
+    # Items, plus revenue from current_price of items where end_date has passed
+    items = Item.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        revenue=Sum(
+            'current_price',
+            filter=Q(end_date__lt=now, end_date__gte=date_from)
+        )
+    )
     
     # Total bids
     total_bids = Bid.objects.filter(created_at__gte=date_from).count()
     
-    # Total revenue (from current_price of items where end_date has passed)
-    total_revenue = Item.objects.filter(
-        end_date__lt=timezone.now(),
-        end_date__gte=date_from
-    ).aggregate(
-        revenue=Sum('current_price')
-    )['revenue'] or 0
-    
     # Calculate conversion rate (bids divided by page views)
     # Note: This is a placeholder. You would need to implement page view tracking
     conversion_rate = 0  # To be calculated if you have page view data
     
     return Response({
-        'total_users': total_users,
-        'new_users': new_users,
-        'total_items': total_items,
-        'active_items': active_items,
+        'total_users': users['total'],
+        'new_users': users['new'],
+        'total_items': items['total'],
+        'active_items': items['active'],
         'total_bids': total_bids,
-        'total_revenue': total_revenue,
+        'total_revenue': items['revenue'] or 0,
         'conversion_rate': conversion_rate
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@cached_analytics('users')
 def user_metrics(request):
     """Provides user-related metrics"""
     
-    time_range = request.query_params.get('timeRange', '30days')
-    date_from = calculate_date_range(time_range)
+    _, date_from = _get_range(request)
     
     # Daily new user registrations
     registrations = User.objects.filter(
@@ -80,27 +108,41 @@ def user_metrics(request):
     ).order_by('hour')
     
     return Response({
-        'registrations': registrations,
-        'logins_by_hour': logins_by_hour
+        'registrations': list(registrations),
+        'logins_by_hour': list(logins_by_hour)
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@cached_analytics('auctions')
 def auction_metrics(request):
     """Provides auction and bidding metrics"""
     
-    time_range = request.query_params.get('timeRange', '30days')
-    date_from = calculate_date_range(time_range)
-    
-    # Bids over time
-    bids_over_time = Bid.objects.filter(
-        created_at__gte=date_from
+    now, date_from = _get_range(request)
+    
+    # Bids over time. Whole days the refresh_analytics_rollups task has
+    # already closed come from DailyBidRollup; the partial first day and
+    # everything since the last refresh are counted live, so the series
+    # matches a live TruncDay query over the same window
+    first_day = timezone.localtime(date_from).date()
+    refreshed_day = _last_refresh_date(DailyBidRollup) or first_day
+    rolled_days = [
+        {'date': _start_of(row['day']), 'count': row['count']}
+        for row in DailyBidRollup.objects.filter(
+            day__gt=first_day, day__lt=refreshed_day
+        ).values('day', 'count')
+    ]
+    live_days = Bid.objects.filter(
+        Q(created_at__lt=_start_of(first_day + timedelta(days=1)))
+        | Q(created_at__gte=_start_of(refreshed_day)),
+        created_at__gte=date_from,
     ).annotate(
         date=TruncDay('created_at')
     ).values('date').annotate(
         count=Count('id')
     ).order_by('date')
+    bids_over_time = sorted([*rolled_days, *live_days], key=lambda row: row['date'])
     
     # Category distribution
     category_distribution = Category.objects.annotate(
@@ -109,40 +151,54 @@ def auction_metrics(request):
     
     # Revenue by category
     revenue_by_category = Item.objects.filter(
-        end_date__lt=timezone.now(),
+        end_date__lt=now,
         end_date__gte=date_from
     ).values('category__name').annotate(
         revenue=Sum('current_price')
     ).order_by('-revenue')
     
-    # Monthly sales
-    monthly_sales = Item.objects.filter(
-        end_date__lt=timezone.now(),
-        end_date__gte=date_from
+    # Monthly sales, split between MonthlySalesRollup and a live query the
+    # same way as the bids above
+    first_month = timezone.localtime(date_from).date().replace(day=1)
+    refreshed_month = (_last_refresh_date(MonthlySalesRollup) or first_month).replace(day=1)
+    rolled_months = [
+        {'month': _start_of(row['month']), 'sales': row['revenue']}
+        for row in MonthlySalesRollup.objects.filter(
+            month__gt=first_month, month__lt=refreshed_month
+        ).values('month', 'revenue')
+    ]
+    live_months = Item.objects.filter(
+        Q(end_date__lt=_start_of((first_month + timedelta(days=32)).replace(day=1)))
+        | Q(end_date__gte=_start_of(refreshed_month)),
+        end_date__lt=now,
+        end_date__gte=date_from,
     ).annotate(
         month=TruncMonth('end_date')
     ).values('month').annotate(
         sales=Sum('current_price')
     ).order_by('month')
+    monthly_sales = sorted([*rolled_months, *live_months], key=lambda row: row['month'])
     
     return Response({
         'bids_over_time': bids_over_time,
-        'category_distribution': category_distribution,
-        'revenue_by_category': revenue_by_category,
+        'category_distribution': list(category_distribution),
+        'revenue_by_category': list(revenue_by_category),
         'monthly_sales': monthly_sales
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@cached_analytics('top_items', timeout=300)
 def top_items(request):
     """Returns top performing items by bids"""
     
-    time_range = request.query_params.get('timeRange', '30days')
-    date_from = calculate_date_range(time_range)
+    _, date_from = _get_range(request)
     
     # Get top items by bid count
-    top_items = Item.objects.annotate(
+    top_items = Item.objects.select_related('category').only(
+        'id', 'title', 'current_price', 'category__name'
+    ).annotate(
         bid_count=Count('bids', filter=Q(bids__created_at__gte=date_from))
     ).order_by('-bid_count')[:10]
     
@@ -162,18 +218,33 @@ def top_items(request):
     return Response(result)
 
 
-def calculate_date_range(time_range):
+_RANGE_DAYS = {'7days': 7, '30days': 30, '90days': 90, 'year': 365}
+
+
+def calculate_date_range(time_range, now=None):
     """Helper function to calculate the start date based on time range"""
+    if now is None:
+        now = timezone.now()
+    # Default to 30 days
+    return now - timedelta(days=_RANGE_DAYS.get(time_range, 30))
+
+
+def _start_of(day):
+    """Midnight at the start of a date in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _last_refresh_date(rollup_model):
+    """
+    Local date of the last refresh_analytics_rollups run that wrote
+    rollup_model, or None before the first one. Every bucket before that
+    date was complete when it was written
+    """
+    refreshed_at = rollup_model.objects.aggregate(at=Max('updated_at'))['at']
+    return timezone.localtime(refreshed_at).date() if refreshed_at else None
+
+
+def _get_range(request):
+    """Return (now, start date) for the request's timeRange, sharing one now"""
     now = timezone.now()
-    
-    if time_range == '7days':
-        return now - timedelta(days=7)
-    elif time_range == '30days':
-        return now - timedelta(days=30)
-    elif time_range == '90days':
-        return now - timedelta(days=90)
-    elif time_range == 'year':
-        return now - timedelta(days=365)
-    else:
-        # Default to 30 days
-        return now - timedelta(days=30)
\ No newline at end of file
+    return now, calculate_date_range(request.query_params.get('timeRange', '30days'), now)
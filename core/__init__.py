@@ -1,4 +1,8 @@
 """
 Core module initialization
 """
-# This file is intentionally left empty to avoid circular import issues
+# Load the Celery app so shared_task dispatches (.delay) use the project config.
+# core.celery does not import Django models, so this is safe at startup.
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
@@ -14,8 +14,20 @@ app = Celery('core')
 # This tells Celery to look for settings with the prefix 'CELERY_' in Django settings
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
-# Auto-discover tasks in all installed apps
-app.autodiscover_tasks()
+# Task modules are listed explicitly (CELERY_IMPORTS) instead of scanning
+# every installed app for a tasks module on each worker start
+
+# Periodic jobs (run with `celery -A core beat`)
+app.conf.beat_schedule = {
+    'refresh-analytics-rollups': {
+        'task': 'auctions.tasks.refresh_analytics_rollups',
+        'schedule': 300.0,  # every 5 minutes
+    },
+    'flush-attempt-audit': {
+        'task': 'auctions.tasks.flush_attempt_audit',
+        'schedule': 10.0,  # every 10 seconds
+    },
+}
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
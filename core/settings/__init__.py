@@ -8,8 +8,10 @@ import os
 environment = os.environ.get('DJANGO_ENVIRONMENT', 'dev')
 
 # Import the appropriate settings
-if environment == 'prod':
+if environment in ('prod', 'production'):
     from .prod import *
+elif environment == 'test':
+    from .test import *
 else:
     # Default to dev settings for any non-production environment
     from .dev import *
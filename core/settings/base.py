@@ -1,58 +1,3 @@
-# Add 'silk' to your INSTALLED_APPS
-THIRD_PARTY_APPS = [
-    "rest_framework",
-    "corsheaders",
-    "storages",  # For S3 storage
-    "silk",  # Django Silk for profiling
-]
-
-# Add Silk middleware - place it as the first middleware
-MIDDLEWARE = [
-    "silk.middleware.SilkyMiddleware",  # Add this as the first middleware
-    "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # For admin static files
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "csp.middleware.CSPMiddleware",
-]
-
-# Add Silk configuration settings
-SILKY_PYTHON_PROFILER = True
-SILKY_PYTHON_PROFILER_BINARY = True
-SILKY_ANALYZE_QUERIES = True
-SILKY_META = True
-SILKY_INTERCEPT_PERCENT = 100  # Log all requests
-SILKY_MAX_RECORDED_REQUESTS = 1000
-SILKY_MAX_RECORDED_REQUESTS_CHECK_PERCENT = 10
-
-# Only allow superusers to access Silk in production
-SILKY_AUTHENTICATION = True
-SILKY_AUTHORISATION = True
-
-
-# Optional: function to determine if user is authorized to access Silk
-def SILKY_AUTHORISATION(user):
-    return user.is_superuser
-
-
-# Add CSP configuration for Silk
-CSP_SCRIPT_SRC = (
-    "'self'",
-    "https://accounts.google.com",
-    "https://apis.google.com",
-    "https://ssl.gstatic.com",
-    "https://*.googleusercontent.com",
-    "https://cdnjs.cloudflare.com",
-    "'unsafe-inline'",  # Needed for Silk
-)
-
-# Add Silk URL to your urls.py
-# path('silk/', include('silk.urls', namespace='silk'))
 """
 Django base settings for core project.
 Common settings shared across all environments.
@@ -61,10 +6,16 @@ Common settings shared across all environments.
 import os
 from pathlib import Path
 
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from dotenv import load_dotenv
 
-# Load environment variables first
-load_dotenv()
+# Load environment variables first. The flag makes re-imports in forked
+# worker processes skip re-reading .env; with gunicorn --preload the master
+# loads it once and the workers inherit the environment.
+if not os.environ.get("_ENV_LOADED"):
+    load_dotenv()
+    os.environ["_ENV_LOADED"] = "1"
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -83,7 +34,6 @@ THIRD_PARTY_APPS = [
     "rest_framework",
     "corsheaders",
     "storages",  # For S3 storage
-    "silk",
 ]
 
 LOCAL_APPS = [
@@ -92,20 +42,20 @@ LOCAL_APPS = [
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
+# Cheap rejectors (SSL redirect, static files, CORS preflight, APPEND_SLASH)
+# run first; timing wraps only what is left, just before the view
 MIDDLEWARE = [
-    "django.middleware.cache.UpdateCacheMiddleware",
-    "auctions.middleware.TimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # For admin static files
-    "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "auctions.middleware.AdminMessageMiddleware",  # Messages for the admin only
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "csp.middleware.CSPMiddleware",
-    "django.middleware.cache.FetchFromCacheMiddleware",
+    "auctions.middleware.TimingMiddleware",
 ]
 
 # URLs
@@ -139,20 +89,30 @@ CACHES = {
         "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/1"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            "SOCKET_CONNECT_TIMEOUT": 1,
-            "SOCKET_TIMEOUT": 1,
+            # Fail fast when Redis is down; misses are cheaper than stalls
+            "SOCKET_CONNECT_TIMEOUT": 0.2,
+            "SOCKET_TIMEOUT": 0.3,
             "IGNORE_EXCEPTIONS": True,
-            "MAX_CONNECTIONS": 100,
-            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
-            "CONNECTION_POOL_KWARGS": {"max_connections": 100},
+            "COMPRESSOR": "django_redis.compressors.zstd.ZStdCompressor",
+            # Wait up to 1s for a free connection instead of raising when
+            # the pool is exhausted
+            "CONNECTION_POOL_CLASS": "redis.BlockingConnectionPool",
+            "CONNECTION_POOL_KWARGS": {"max_connections": 50, "timeout": 1.0},
         },
         "KEY_PREFIX": "youtuber_bid_",
+        "VERSION": 2,  # Bumped when the compressor changed to zstd
         "TIMEOUT": 1200,
     }
 }
 
-# Session settings - using Redis for better performance
-SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+# Treat Redis errors as cache misses everywhere, and log them so an outage
+# is still visible
+DJANGO_REDIS_IGNORE_EXCEPTIONS = True
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+# Session settings - read through Redis, written through to the database so
+# sessions survive a cache flush and can still be revoked server-side
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
 SESSION_COOKIE_AGE = 1209600
 
@@ -200,13 +160,20 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Static files - needed for admin
 STATIC_URL = "/static/"
-STATIC_ROOT = os.path.join(BASE_DIR, "static")
+STATIC_ROOT = BASE_DIR / "static"
 
 # Media files
 # Media URL constructed in environment-specific settings
-MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+MEDIA_ROOT = BASE_DIR / "media"
 
 # Database
+# psycopg 3 connection pool (per worker process)
+DATABASE_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "4")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+    "timeout": 10,  # seconds to wait for a free connection
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -215,9 +182,12 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST", "konosmgr.com"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
-        "CONN_MAX_AGE": 60,  # Keep connections alive for 60 seconds
+        # Connections are reused through the psycopg pool below; Django's own
+        # persistent connections must stay off when a pool is configured
+        "CONN_MAX_AGE": 0,
         "OPTIONS": {
             "connect_timeout": 10,
+            "pool": DATABASE_POOL_OPTIONS,
         },
     }
 }
@@ -231,12 +201,37 @@ AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = None
 AWS_S3_SIGNATURE_VERSION = "s3v4"
+# Shared by the storage backend's client and auctions.storage.get_s3_client
+AWS_S3_CLIENT_CONFIG = Config(
+    signature_version=AWS_S3_SIGNATURE_VERSION,
+    max_pool_connections=50,
+    # Back off client-side when S3 answers 503 SlowDown
+    retries={"mode": "adaptive", "max_attempts": 5},
+    tcp_keepalive=True,
+)
 AWS_S3_OBJECT_PARAMETERS = {
     "CacheControl": "max-age=604800",
 }
 AWS_QUERYSTRING_AUTH = False
+# Multipart uploads above 8 MB, with parts sent in parallel
+AWS_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+)
 
-DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+# Media on S3 through the optimizing, deduplicating backend; static files
+# hashed and precompressed (gzip/brotli) at collectstatic so WhiteNoise
+# serves them without compressing per request
+STORAGES = {
+    "default": {
+        "BACKEND": "auctions.storage.DebugS3Storage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Logging configuration
 LOGGING = {
@@ -254,15 +249,15 @@ LOGGING = {
         },
         "storages": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
         },
         "boto3": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
         },
         "botocore": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
         },
     },
 }
@@ -280,30 +275,43 @@ REST_FRAMEWORK = {
 FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5 MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# WebP re-encoding for uploaded images (method 6 = slowest encode, smallest output)
+WEBP_QUALITY = 82
+WEBP_METHOD = 6
+
 # Google Auth settings
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 
-# Frontend URL for email verification links
-FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
-
-# Add Silk configuration settings
-SILKY_PYTHON_PROFILER = True
-SILKY_PYTHON_PROFILER_BINARY = True
-SILKY_ANALYZE_QUERIES = True
-SILKY_META = True
-SILKY_INTERCEPT_PERCENT = 100  # Log all requests
-SILKY_MAX_RECORDED_REQUESTS = 1000
-SILKY_MAX_RECORDED_REQUESTS_CHECK_PERCENT = 10
+# reCAPTCHA checks on registration and repeated failed logins; on unless the
+# environment switches them off (development settings do)
+RECAPTCHA_ENABLED = os.getenv("RECAPTCHA_ENABLED", "true").lower() == "true"
 
-# Only allow superusers to access Silk in production
-SILKY_AUTHENTICATION = True
-SILKY_AUTHORISATION = True
+# Login rate limiting: "approximate_sliding" keeps two counters per key
+# (constant memory); "sliding_log" stores every attempt (exact)
+RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "approximate_sliding")
 
+# Frontend URL for email verification links
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
-# Optional: function to determine if user is authorized to access Silk
-def SILKY_AUTHORISATION(user):
-    return user.is_superuser
-
+# Bump to invalidate every cached analytics dashboard response
+ANALYTICS_VERSION = int(os.getenv("ANALYTICS_VERSION", "1"))
+
+# Celery settings (emails and other slow work run outside the request)
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+# msgpack is smaller and faster than JSON; json stays accepted so messages
+# queued before the switch still run
+CELERY_ACCEPT_CONTENT = ["msgpack", "json"]
+CELERY_TASK_SERIALIZER = "msgpack"
+CELERY_RESULT_SERIALIZER = "msgpack"
+CELERY_TIMEZONE = "UTC"
+CELERY_IMPORTS = ("auctions.tasks",)
+CELERY_BROKER_POOL_LIMIT = 10
+# Email tasks are slow and few; don't let one worker reserve a backlog of them
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Acknowledge after the task runs so a worker crash mid-send requeues the email
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
 
 # Content Security Policy settings
 CSP_DEFAULT_SRC = ("'self'",)
@@ -314,7 +322,6 @@ CSP_SCRIPT_SRC = (
     "https://ssl.gstatic.com",
     "https://*.googleusercontent.com",
     "https://cdnjs.cloudflare.com",
-    "'unsafe-inline'",
 )
 CSP_STYLE_SRC = (
     "'self'",
@@ -348,8 +355,3 @@ ITEM_LIST_CACHE_TIMEOUT = 60 * 10  # 10 minutes for item lists
 ITEM_DETAIL_CACHE_TIMEOUT = 60 * 5  # 5 minutes for item details
 MEDIUM_CACHE_TIMEOUT = 60 * 10  # 10 minutes
 SHORT_CACHE_TIMEOUT = 60 * 2  # 2 minutes
-
-# Cache middleware settings
-CACHE_MIDDLEWARE_ALIAS = "default"
-CACHE_MIDDLEWARE_SECONDS = 600
-CACHE_MIDDLEWARE_KEY_PREFIX = "youtuber_bid_middleware"
@@ -3,14 +3,8 @@ Django development settings for core project.
 """
 
 print("=== LOADING DEV SETTINGS ===")
-import logging
-
-import boto3
-
 from .base import *
 
-boto3.set_stream_logger("", logging.DEBUG)
-
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "django-insecure-development-key")
 
@@ -28,13 +22,38 @@ ALLOWED_HOSTS = [
 ]
 
 # Development-specific apps
-INSTALLED_APPS += ["django_celery_beat", "debug_toolbar"]
+INSTALLED_APPS += ["django_celery_beat", "debug_toolbar", "silk"]
 
 # Development-specific middleware
-MIDDLEWARE += ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+MIDDLEWARE += [
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "silk.middleware.SilkyMiddleware",
+]
+
+# Silk profiling (development only). By default it records a light sample of
+# requests; set SILK_FULL=1 while actively profiling to record every request
+# with the Python profiler and EXPLAIN for each query
+SILK_FULL = os.getenv("SILK_FULL") == "1"
+SILKY_PYTHON_PROFILER = SILK_FULL or os.getenv("SILKY_PYTHON_PROFILER", "False") == "True"
+# .prof dumps are written synchronously in the response; enable with the profiler
+SILKY_PYTHON_PROFILER_BINARY = SILKY_PYTHON_PROFILER
+SILKY_ANALYZE_QUERIES = SILK_FULL
+SILKY_META = True
+SILKY_INTERCEPT_PERCENT = 100 if SILK_FULL else 5
+SILKY_MAX_RECORDED_REQUESTS = 200
+SILKY_MAX_RECORDED_REQUESTS_CHECK_PERCENT = 1
+
+# Only allow superusers to access Silk
+SILKY_AUTHENTICATION = True
+
+
+def SILKY_AUTHORISATION(user):
+    return user.is_superuser
 
-# Development recaptcha key
+
+# Development recaptcha key; verification is skipped locally
 RECAPTCHA_SECRET_KEY = "temporary-dev-key"
+RECAPTCHA_ENABLED = False
 
 # CORS settings for development
 CORS_ALLOWED_ORIGINS = [
@@ -90,7 +109,6 @@ SESSION_COOKIE_NAME = "sessionid"
 SESSION_COOKIE_SECURE = False
 SESSION_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_HTTPONLY = True
-SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_COOKIE_AGE = 1209600
 
 # Make sure these are defined from base settings before using them
@@ -102,8 +120,6 @@ else:
     print("WARNING: AWS S3 settings not found, using local media URL")
     MEDIA_URL = "/media/"
 
-MEDIA_ROOT = BASE_DIR / "media"
-
 # Set a shorter cache timeout to ensure deleted items don't show up for long
 CACHES = {
     "default": {
@@ -114,11 +130,14 @@ CACHES = {
             "SOCKET_CONNECT_TIMEOUT": 3,
             "SOCKET_TIMEOUT": 3,
             "IGNORE_EXCEPTIONS": True,
-            "MAX_CONNECTIONS": 50,
-            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
-            "CONNECTION_POOL_KWARGS": {"max_connections": 50},
+            "COMPRESSOR": "django_redis.compressors.zstd.ZStdCompressor",
+            # Wait up to 1s for a free connection instead of raising when
+            # the pool is exhausted
+            "CONNECTION_POOL_CLASS": "redis.BlockingConnectionPool",
+            "CONNECTION_POOL_KWARGS": {"max_connections": 50, "timeout": 1.0},
         },
         "KEY_PREFIX": "youtuber_bid_dev_",
+        "VERSION": 2,  # Bumped when the compressor changed to zstd
         "TIMEOUT": 30,  # 30 seconds instead of 600
     },
     "fallback": {
@@ -148,7 +167,7 @@ print(
     f"S3 Settings Check - AWS_STORAGE_BUCKET_NAME: {os.getenv('AWS_STORAGE_BUCKET_NAME', 'Not set')}"
 )
 
-# Add logging configuration to see S3 uploads
+# Logging configuration; raise a logger to DEBUG only while investigating it
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -168,15 +187,15 @@ LOGGING = {
         },
         "botocore": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
         },
         "s3transfer": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
         },
         "django.db.backends": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": "WARNING",
             "propagate": False,
         },
     },
@@ -188,14 +207,6 @@ USE_S3 = True
 # added stuff from here on
 
 
-# Celery settings
-CELERY_BROKER_URL = "redis://redis:6379/0"
-CELERY_RESULT_BACKEND = "redis://redis:6379/0"
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
-CELERY_TIMEZONE = "UTC"
-
 # Update CSP settings for development
 CSP_SCRIPT_SRC += (
     "'unsafe-inline'",
@@ -229,12 +240,21 @@ CSP_FONT_SRC += (
     "http://127.0.0.1:5173",
 )
 
+# Drop repeated sources so the Content-Security-Policy header stays short
+CSP_SCRIPT_SRC = tuple(dict.fromkeys(CSP_SCRIPT_SRC))
+CSP_STYLE_SRC = tuple(dict.fromkeys(CSP_STYLE_SRC))
+CSP_IMG_SRC = tuple(dict.fromkeys(CSP_IMG_SRC))
+CSP_CONNECT_SRC = tuple(dict.fromkeys(CSP_CONNECT_SRC))
+CSP_FONT_SRC = tuple(dict.fromkeys(CSP_FONT_SRC))
+
 # Debug toolbar settings
 DEBUG_TOOLBAR_CONFIG = {
     "SHOW_TOOLBAR_CALLBACK": lambda request: True,
 }
 
-INTERNAL_IPS = ["127.0.0.1", "localhost", "0.0.0.0", "*"]
+# Static list (no DNS lookup at import): loopback plus the usual Docker bridge
+# gateways. INTERNAL_IPS does not support wildcards such as "*"
+INTERNAL_IPS = ["127.0.0.1", "localhost", "172.17.0.1", "172.18.0.1", "172.19.0.1", "172.20.0.1"]
 
 # Override database settings for development
 DATABASES = {
@@ -245,9 +265,10 @@ DATABASES = {
         "PASSWORD": "postgres",
         "HOST": "db",  # Use the service name from docker-compose
         "PORT": "5432",
-        "CONN_MAX_AGE": 60,
+        "CONN_MAX_AGE": 0,
         "OPTIONS": {
             "connect_timeout": 5,  # Reduced timeout for local connections
+            "pool": DATABASE_POOL_OPTIONS,
         },
     }
 }
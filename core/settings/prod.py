@@ -2,6 +2,8 @@
 Django production settings for core project.
 """
 
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 # SECURITY WARNING: keep the secret key used in production secret!
@@ -26,17 +28,28 @@ if os.environ.get("POSTGRES_HOST"):
     postgres_host = os.environ.get("POSTGRES_HOST", "db")
     postgres_port = int(os.environ.get("POSTGRES_PORT", "5432"))
 
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    while True:
+    # Exponential backoff capped at 5s, giving up after about two minutes and
+    # leaving the first query to report the error
+    for attempt in range(30):
         try:
-            s.connect((postgres_host, postgres_port))
-            s.close()
+            socket.create_connection((postgres_host, postgres_port), timeout=2).close()
             break
-        except socket.error:
-            time.sleep(0.1)
+        except OSError:
+            time.sleep(min(0.1 * 2**attempt, 5))
+
+# Fail fast on connect and cap runaway queries at 30s. POSTGRES_HOST may point
+# at a PgBouncer (transaction mode) in front of Postgres
+DATABASES["default"]["OPTIONS"] = {
+    "connect_timeout": 5,
+    "options": "-c statement_timeout=30000",
+    "pool": DATABASE_POOL_OPTIONS,
+}
 
 # Production recaptcha key (from environment)
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
+if RECAPTCHA_ENABLED and not RECAPTCHA_SECRET_KEY:
+    # Every CAPTCHA check would fail and lock users out of registration and login
+    raise ImproperlyConfigured("RECAPTCHA_SECRET_KEY must be set while RECAPTCHA_ENABLED is on")
 
 # CORS settings for production
 CORS_ALLOWED_ORIGINS = [
@@ -90,7 +103,6 @@ SESSION_COOKIE_NAME = "sessionid"
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_HTTPONLY = True
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
 SESSION_COOKIE_AGE = 1209600
 
 # Security settings for production
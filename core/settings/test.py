@@ -0,0 +1,24 @@
+"""
+Django test settings for core project.
+Development settings without the request profiling and debug tooling, which
+would record test requests and add queries to the ones tests count.
+"""
+
+import copy
+
+from .dev import *
+
+# The test runner switches DEBUG off anyway; do it before the URLconf loads
+DEBUG = False
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ("debug_toolbar", "silk")]
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in ("debug_toolbar.middleware.DebugToolbarMiddleware", "silk.middleware.SilkyMiddleware")
+]
+
+# Tests get their own Redis database so clearing it never touches dev data
+CACHES = copy.deepcopy(CACHES)
+CACHES["default"]["LOCATION"] = CACHES["default"]["LOCATION"].rsplit("/", 1)[0] + "/15"
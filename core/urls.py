@@ -6,13 +6,18 @@ from django.urls import include, path
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("auctions.urls")),
-    path("silk/", include("silk.urls", namespace="silk")),  # Silk URLs
 ]
 
-# Add Debug Toolbar URLs in development
+# Add Debug Toolbar and Silk URLs in development
 if settings.DEBUG:
     import debug_toolbar
 
     urlpatterns += [
         path("__debug__/", include(debug_toolbar.urls)),
     ]
+
+    # Only import Silk's URLs (and models) where the app is installed
+    if "silk" in settings.INSTALLED_APPS:
+        urlpatterns += [
+            path("silk/", include("silk.urls", namespace="silk")),
+        ]